@@ -13,20 +13,15 @@ export default function GetBudgets() {
 
     const [budgets, setBudgets] = useState(null);
     const [budgetId, setBudgetId] = useState();
-    const [currentBalances, setCurrentBalance] = useState([]);
     const [isActive, setIsActive] = useState('budgetsHome');
 
     useEffect(() => {
         fetchBudgets();
     }, []);
 
-    useEffect(() => {
-        fetchCurrentBalances();
-    }, []);
-
     const fetchBudgets = async () => {
         try {
-            const response = await axios.get('http://127.0.0.1:8000/peppermint/budget/my_budgets', {
+            const response = await axios.get('http://127.0.0.1:8000/peppermint/budget/progress', {
                 headers: {
                     Authorization: `Bearer ${getToken()}`
                 }
@@ -37,19 +32,6 @@ export default function GetBudgets() {
         }
     };
 
-    const fetchCurrentBalances = async () => {
-        try {
-            const cbResponse = await axios.get('http://127.0.0.1:8000/peppermint/budget/current_balances', {
-                headers: {
-                    Authorization: `Bearer ${getToken()}`
-                }
-            });
-            setCurrentBalance(cbResponse.data);
-        } catch (error) {
-            handleError(error, navigate);
-        }
-    };
-
     const handleDeleteBudget = async (id) => {
         try {
             await axios.delete(`http://127.0.0.1:8000/peppermint/budget/${id}`, {
@@ -85,11 +67,10 @@ export default function GetBudgets() {
                         </i>
                     </div>
                     <div>
-                        {!budgets ? (
+                        {!budgets || budgets.length === 0 ? (
                             <p> No budgets found </p>
                         ) : (
                             <BudgetsDisplay
-                                currentBalances={currentBalances}
                                 budgets={budgets}
                                 handleFormClick={handleFormClick}
                                 handleDeleteBudget={handleDeleteBudget}
@@ -1,7 +1,7 @@
 import FormatCurrency from "../../app_utilities/FormatCurrency";
 import { MdOutlineEdit, MdDeleteOutline } from "react-icons/md";
 
-export default function BudgetsDisplay({ currentBalances, budgets, handleFormClick, handleDeleteBudget }) {
+export default function BudgetsDisplay({ budgets, handleFormClick, handleDeleteBudget }) {
     return (
         <>
             <table>
@@ -17,7 +17,7 @@ export default function BudgetsDisplay({ currentBalances, budgets, handleFormCli
                     {budgets.map(budget => (
                         <tr key={budget.id}>
                             <td>{budget.budget_category}</td>
-                            <td><FormatCurrency amount={currentBalances[budget.budget_category]} /></td>
+                            <td><FormatCurrency amount={budget.spent} /></td>
                             <td><FormatCurrency amount={budget.budget_amount} /></td>
                             <td>
                                 <i className="edit-button" title="Edit Budget">
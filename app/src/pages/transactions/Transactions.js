@@ -6,25 +6,33 @@ import FormatCurrency from '../../app_utilities/FormatCurrency';
 import FormatDate from '../../app_utilities/FormatDate';
 import { handleError } from '../../app_utilities/HandleError';
 
+const PAGE_SIZE = 50;
+
 const GetAllTransactions = () => {
     const navigate = useNavigate();
     const getToken = () => localStorage.getItem('token');
 
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
 
     useEffect(() => {
         fetchAllTransactions();
     }, []);
 
-    const fetchAllTransactions = async () => {
+    // first page, or the page after `after` appended to the list
+    const fetchAllTransactions = async (after = null) => {
         try {
             const response = await axios.get('http://127.0.0.1:8000/peppermint/account/all_transactions', {
                 headers: {
                     Authorization: `Bearer ${getToken()}`
-                }
+                },
+                params: after ? { limit: PAGE_SIZE, after } : { limit: PAGE_SIZE }
             });
             const data = response.data
-            if (data.length === 0) {
+            setNextCursor(response.headers['x-next-cursor'] || null);
+            if (after) {
+                setTransactions(previous => [...previous, ...data]);
+            } else if (data.length === 0) {
                 alert('No Transactions available at this time');
                 setTransactions([]);
             } else {
@@ -88,6 +96,9 @@ const GetAllTransactions = () => {
                             </tbody>
                         </table>
                     )}
+                    {nextCursor && (
+                        <button type="button" onClick={() => fetchAllTransactions(nextCursor)}>Load more</button>
+                    )}
                 </div>
             </div>
         </>
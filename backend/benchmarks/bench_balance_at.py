@@ -0,0 +1,101 @@
+"""
+Cost of get_balance_at as an account's history grows. The lookup reads two
+checkpoint running totals and one month of transactions, so the time per
+call should stay flat from a 1 year to a 50 year history.
+
+Run from backend/:  python -m benchmarks.bench_balance_at
+"""
+
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from domain.transaction.transaction_checkpoint import (
+    get_balance_at,
+    rebuild_checkpoints,
+)
+from models import Base, User, Account, Category, Transaction
+
+YEARS = (1, 10, 50)
+PER_MONTH = 30
+CALLS = 500
+MISC_ID = 1
+
+
+def seed(Session, years: int) -> None:
+    db = Session()
+    now = datetime.utcnow()
+    db.add(
+        User(
+            id="bench-user",
+            username="bench",
+            password="x",
+            email="bench@example.com",
+            first_name="bench",
+            last_name="bench",
+            created=now,
+            modified=now,
+            login_attempts=0,
+        )
+    )
+    db.add(Category(id=MISC_ID, name="misc", is_expense=True))
+    rows = years * 12 * PER_MONTH
+    db.add(
+        Account(
+            id="bench-account",
+            account_type="checking",
+            institution="bench",
+            current_balance=float(rows),
+            user_id="bench-user",
+        )
+    )
+    start = datetime(2024 - years, 1, 1)
+    step = timedelta(days=365.25 / 12 / PER_MONTH)
+    db.add_all(
+        Transaction(
+            id=str(uuid.uuid4()),
+            transaction_date=start + step * i,
+            transaction_description="bench",
+            category_id=MISC_ID,
+            transaction_amount=1.0,
+            account_id="bench-account",
+        )
+        for i in range(rows)
+    )
+    db.commit()
+    rebuild_checkpoints(db, "bench-account")
+    db.close()
+
+
+def run(years: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        seed(Session, years)
+
+        db = Session()
+        account = db.get(Account, "bench-account")
+        # the first month is the worst case: every later month is after it
+        at = datetime(2024 - years, 1, 15)
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            get_balance_at(db, account, at)
+        elapsed = time.perf_counter() - start
+        db.close()
+        engine.dispose()
+
+        return elapsed / CALLS * 1000
+
+
+def main():
+    print(f"{'years':>6} {'transactions':>13} {'ms/call':>8}")
+    for years in YEARS:
+        print(f"{years:>6} {years * 12 * PER_MONTH:>13} {run(years):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
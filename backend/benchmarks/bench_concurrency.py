@@ -0,0 +1,112 @@
+"""
+Throughput of authenticated read endpoints at 50 / 200 / 1000 concurrent
+clients, for the routes on the async session and for sync routes on the
+worker thread pool.
+
+Start the API first, e.g. with the default and a larger worker thread pool:
+
+    THREADPOOL_SIZE=40 uvicorn main:app
+    THREADPOOL_SIZE=200 uvicorn main:app
+
+then run from backend/:
+
+    python -m benchmarks.bench_concurrency --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+import httpx
+
+CONCURRENCY_LEVELS = [50, 200, 1000]
+ENDPOINTS = {
+    "async": [
+        "/peppermint/account/my_accounts",
+        "/peppermint/account/all_transactions?limit=50",
+        "/peppermint/account/total_balances",
+    ],
+    "sync": [
+        "/peppermint/budget/my_budgets",
+        "/peppermint/account/expenses",
+        "/peppermint/account/expenses/six_months",
+    ],
+}
+BENCH_USER = {
+    "username": "benchuser",
+    "password1": "benchpassword",
+    "password2": "benchpassword",
+    "first_name": "BENCH",
+    "last_name": "USER",
+    "email": "benchuser@example.com",
+}
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    await client.post("/peppermint/user/register", json=BENCH_USER)
+    response = await client.post(
+        "/peppermint/user/login",
+        data={"username": BENCH_USER["username"], "password": BENCH_USER["password1"]},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    token: str,
+    endpoints: list[str],
+    clients: int,
+    requests_per_client: int,
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    errors = Counter()
+
+    async def worker(offset: int):
+        for i in range(requests_per_client):
+            endpoint = endpoints[(offset + i) % len(endpoints)]
+            started = time.perf_counter()
+            try:
+                response = await client.get(endpoint, headers=headers)
+                if response.status_code != 200:
+                    errors[response.status_code] += 1
+            except httpx.HTTPError as error:
+                errors[type(error).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{clients:>8} {len(latencies) / elapsed:>10.0f} "
+        f"{statistics.median(latencies) * 1000:>9.1f} {p95 * 1000:>9.1f} "
+        f"{sum(errors.values()):>7} {dict(errors) if errors else ''}"
+    )
+
+
+async def main(url: str, requests_per_client: int):
+    limits = httpx.Limits(max_connections=max(CONCURRENCY_LEVELS))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        for name, endpoints in ENDPOINTS.items():
+            print(f"{name} routes")
+            print(
+                f"{'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+                f"{'errors':>7}"
+            )
+            for clients in CONCURRENCY_LEVELS:
+                # access tokens are short-lived, take a fresh one per level
+                token = await login(client)
+                await run_level(client, token, endpoints, clients, requests_per_client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.requests_per_client))
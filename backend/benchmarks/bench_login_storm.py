@@ -0,0 +1,88 @@
+"""
+Login throughput, and the latency of other endpoints while a login storm runs.
+
+Start the API first, e.g. comparing hashing on the request threads with the
+process pool:
+
+    PASSWORD_HASH_WORKERS=0 uvicorn main:app
+    PASSWORD_HASH_WORKERS=4 uvicorn main:app
+
+then run from backend/:
+
+    python -m benchmarks.bench_login_storm --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from benchmarks.bench_concurrency import BENCH_USER, login
+
+PROBE_ENDPOINT = "/peppermint/account/my_accounts"
+
+
+def summarize(latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return f"{statistics.median(latencies) * 1000:>9.1f} {p95 * 1000:>9.1f}"
+
+
+async def probe(client: httpx.AsyncClient, token: str, stop: asyncio.Event):
+    """
+    Requests a cheap authenticated endpoint back to back until stopped
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(PROBE_ENDPOINT, headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def storm(client: httpx.AsyncClient, clients: int, logins_per_client: int):
+    form = {"username": BENCH_USER["username"], "password": BENCH_USER["password1"]}
+
+    async def worker():
+        for _ in range(logins_per_client):
+            response = await client.post("/peppermint/user/login", data=form)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+
+
+async def main(url: str, clients: int, logins_per_client: int, probes: int):
+    limits = httpx.Limits(max_connections=clients + probes)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        token = await login(client)
+
+        stop = asyncio.Event()
+        baseline = asyncio.gather(*(probe(client, token, stop) for _ in range(probes)))
+        await asyncio.sleep(2)
+        stop.set()
+        idle = [latency for result in await baseline for latency in result]
+
+        stop = asyncio.Event()
+        probing = asyncio.gather(*(probe(client, token, stop) for _ in range(probes)))
+        started = time.perf_counter()
+        await storm(client, clients, logins_per_client)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        busy = [latency for result in await probing for latency in result]
+
+    print(f"logins/s during storm: {clients * logins_per_client / elapsed:.1f}")
+    print(f"{PROBE_ENDPOINT:<32} {'p50 ms':>9} {'p95 ms':>9}")
+    print(f"{'  idle':<32} {summarize(idle)}")
+    print(f"{'  during login storm':<32} {summarize(busy)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--logins-per-client", type=int, default=4)
+    parser.add_argument("--probes", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.clients, args.logins_per_client, args.probes))
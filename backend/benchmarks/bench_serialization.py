@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: serializing a 10k-transaction response.
+
+Compares FastAPI's old path for routes without a response model
+(jsonable_encoder + JSONResponse) with the typed path (validate against
+list[TransactionResponse], pydantic-core dump + ORJSONResponse).
+
+Run from backend/:  python -m benchmarks.bench_serialization
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models import Base, Category, Transaction
+from domain.transaction.transaction_schema import TransactionResponse
+
+ROWS = 10_000
+REPEAT = 5
+MISC_ID = 1
+
+
+def load_transactions() -> list[Transaction]:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Category(id=MISC_ID, name="misc", is_expense=True))
+    start = datetime(2020, 1, 1)
+    db.execute(
+        insert(Transaction),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "transaction_date": start + timedelta(minutes=i),
+                "transaction_description": f"bench transaction {i}",
+                "category_id": MISC_ID,
+                "transaction_amount": i / 100,
+                "account_id": "bench-account",
+            }
+            for i in range(ROWS)
+        ],
+    )
+    db.commit()
+    return db.query(Transaction).all()
+
+
+def untyped(transactions) -> bytes:
+    return JSONResponse(jsonable_encoder(transactions)).body
+
+
+def typed(transactions, adapter: TypeAdapter) -> bytes:
+    content = adapter.validate_python(transactions, from_attributes=True)
+    return ORJSONResponse(adapter.dump_python(content, mode="json")).body
+
+
+def best_of(function, *args) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    transactions = load_transactions()
+    adapter = TypeAdapter(list[TransactionResponse])
+
+    untyped_time = best_of(untyped, transactions)
+    typed_time = best_of(typed, transactions, adapter)
+
+    print(f"{ROWS} transactions, best of {REPEAT}")
+    print(f"{'path':>38} {'ms':>9} {'bytes':>9}")
+    print(
+        f"{'jsonable_encoder + JSONResponse':>38} {untyped_time * 1000:>9.1f} "
+        f"{len(untyped(transactions)):>9}"
+    )
+    print(
+        f"{'response model + ORJSONResponse':>38} {typed_time * 1000:>9.1f} "
+        f"{len(typed(transactions, adapter)):>9}"
+    )
+
+
+if __name__ == "__main__":
+    main()
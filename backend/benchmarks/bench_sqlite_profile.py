@@ -0,0 +1,138 @@
+"""
+Concurrent read + write throughput on SQLite, default settings vs the
+SQLITE_TUNING profile (WAL, synchronous=NORMAL, cache/mmap/temp_store).
+
+Run from backend/:  python -m benchmarks.bench_sqlite_profile
+"""
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from database import apply_sqlite_pragmas
+from domain.transaction.transaction_crud import get_account_transactions_by_month
+from models import Base, User, Account, Category, Transaction
+
+WRITERS = 4
+READERS = 8
+DURATION = 5.0
+SEED_ROWS = 20_000
+MISC_ID = 1
+
+
+def build_engine(path: str, tuned: bool):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=WRITERS + READERS,
+    )
+    if tuned:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+
+def seed(Session):
+    db = Session()
+    now = datetime.utcnow()
+    db.add(
+        User(
+            id="bench-user",
+            username="bench",
+            password="x",
+            email="bench@example.com",
+            first_name="bench",
+            last_name="bench",
+            created=now,
+            modified=now,
+            login_attempts=0,
+        )
+    )
+    db.add(Category(id=MISC_ID, name="misc", is_expense=True))
+    db.add(
+        Account(
+            id="bench-account",
+            account_type="checking",
+            institution="bench",
+            current_balance=0,
+            user_id="bench-user",
+        )
+    )
+    start = datetime(2024, 1, 1)
+    db.add_all(
+        Transaction(
+            id=str(uuid.uuid4()),
+            transaction_date=start + timedelta(minutes=i * 20),
+            transaction_description="bench",
+            category_id=MISC_ID,
+            transaction_amount=1.0,
+            account_id="bench-account",
+        )
+        for i in range(SEED_ROWS)
+    )
+    db.commit()
+    db.close()
+
+
+def run(tuned: bool) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = build_engine(path, tuned)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        seed(Session)
+
+        counts = {"reads": 0, "writes": 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + DURATION
+
+        def writer():
+            db = Session()
+            while time.perf_counter() < stop:
+                db.add(
+                    Transaction(
+                        id=str(uuid.uuid4()),
+                        transaction_date=datetime(2024, 6, 15),
+                        transaction_description="write",
+                        category_id=MISC_ID,
+                        transaction_amount=1.0,
+                        account_id="bench-account",
+                    )
+                )
+                db.commit()
+                with lock:
+                    counts["writes"] += 1
+            db.close()
+
+        def reader():
+            db = Session()
+            while time.perf_counter() < stop:
+                get_account_transactions_by_month(db, "bench-account", 2024, 6)
+                db.rollback()
+                with lock:
+                    counts["reads"] += 1
+            db.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(WRITERS)]
+        threads += [threading.Thread(target=reader) for _ in range(READERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+        return counts["reads"] / DURATION, counts["writes"] / DURATION
+
+
+def main():
+    print(f"{'profile':>8} {'reads/s':>10} {'writes/s':>10}")
+    for tuned in (False, True):
+        reads, writes = run(tuned)
+        print(f"{'tuned' if tuned else 'default':>8} {reads:>10.1f} {writes:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
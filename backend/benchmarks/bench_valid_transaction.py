@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: valid_transaction latency as the account grows.
+
+Run from backend/:  python -m benchmarks.bench_valid_transaction
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, Account, Category, Transaction
+from domain.transaction.transaction_crud import valid_transaction
+
+ACCOUNT_SIZES = [1_000, 10_000, 50_000, 100_000]
+LOOKUPS = 2_000
+MISC_ID = 1
+
+
+def seed(db, account_id: str, rows: int) -> list[str]:
+    start = datetime(2020, 1, 1)
+    ids = [str(uuid.uuid4()) for _ in range(rows)]
+    db.execute(
+        insert(Transaction),
+        [
+            {
+                "id": transaction_id,
+                "transaction_date": start + timedelta(minutes=i),
+                "transaction_description": "bench",
+                "category_id": MISC_ID,
+                "transaction_amount": 1.0,
+                "account_id": account_id,
+            }
+            for i, transaction_id in enumerate(ids)
+        ],
+    )
+    db.commit()
+    return ids
+
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    now = datetime.utcnow()
+    db.add(
+        User(
+            id="bench-user",
+            username="bench",
+            password="x",
+            email="bench@example.com",
+            first_name="bench",
+            last_name="bench",
+            created=now,
+            modified=now,
+            login_attempts=0,
+        )
+    )
+    db.add(Category(id=MISC_ID, name="misc", is_expense=True))
+    db.commit()
+
+    print(f"{'rows':>8} {'us/lookup':>10} {'us/lookup (user join)':>22}")
+    for size in ACCOUNT_SIZES:
+        account_id = str(uuid.uuid4())
+        db.add(
+            Account(
+                id=account_id,
+                account_type="checking",
+                institution="bench",
+                current_balance=0.0,
+                user_id="bench-user",
+            )
+        )
+        ids = seed(db, account_id, size)
+        probe = ids[: LOOKUPS // 2] + [str(uuid.uuid4()) for _ in range(LOOKUPS // 2)]
+
+        timings = []
+        for user_id in (None, "bench-user"):
+            started = time.perf_counter()
+            for transaction_id in probe:
+                valid_transaction(db, account_id, transaction_id, user_id)
+            timings.append((time.perf_counter() - started) / len(probe) * 1e6)
+
+        print(f"{size:>8} {timings[0]:>10.1f} {timings[1]:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,137 @@
-from sqlalchemy import create_engine
+import asyncio
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.config import Config
+
+config = Config(".env")
+
+SQLALCHEMY_DATABASE_URL = config("DATABASE_URL", default="sqlite:///./peppermint.db")
+# sync routes and dependencies run on this many worker threads (anyio's default is 40)
+THREADPOOL_SIZE = config("THREADPOOL_SIZE", cast=int, default=100)
+DB_POOL_SIZE = config("DB_POOL_SIZE", cast=int, default=5)
+# unset: 10 on PostgreSQL; on SQLite enough for every worker thread to hold
+# a connection, so writers queue on the database lock rather than the pool
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", cast=int, default=None)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", cast=int, default=1800)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", cast=bool, default=True)
+# milliseconds, 0 disables the limit
+DB_STATEMENT_TIMEOUT = config("DB_STATEMENT_TIMEOUT", cast=int, default=0)
+
+# opt-in SQLite performance profile (WAL journal, relaxed fsync, bigger caches)
+SQLITE_TUNING = config("SQLITE_TUNING", cast=bool, default=False)
+SQLITE_CACHE_SIZE_KB = config("SQLITE_CACHE_SIZE_KB", cast=int, default=65536)
+SQLITE_MMAP_SIZE = config("SQLITE_MMAP_SIZE", cast=int, default=268435456)
+# milliseconds a SQLite writer waits on a locked database, tuned or not
+SQLITE_BUSY_TIMEOUT = config("SQLITE_BUSY_TIMEOUT", cast=int, default=30000)
+# seconds between wal_checkpoint / optimize runs
+SQLITE_MAINTENANCE_INTERVAL = config(
+    "SQLITE_MAINTENANCE_INTERVAL", cast=int, default=300
+)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def database_backend(url: str) -> str:
+    """
+    returns the backend name of a database url, e.g. "sqlite" or "postgresql"
+    """
+    return url.split(":", 1)[0].split("+", 1)[0]
+
+
+def async_database_url(url: str) -> str:
+    """
+    Swaps the sync driver of a database url for its async counterpart
+    (aiosqlite for SQLite, asyncpg for PostgreSQL)
+    """
+    scheme, rest = url.split(":", 1)
+    return f"{ASYNC_DRIVERS.get(database_backend(url), scheme)}:{rest}"
+
+
+def engine_options(url: str, asynchronous: bool = False) -> dict:
+    """
+    Pool and connection settings for create_engine / create_async_engine
+    """
+    options = {
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    backend = database_backend(url)
+
+    # in-memory SQLite uses a single connection pool
+    if backend != "sqlite" or not (":memory:" in url or url.endswith("://")):
+        options["pool_size"] = DB_POOL_SIZE
+        if DB_MAX_OVERFLOW is not None:
+            options["max_overflow"] = DB_MAX_OVERFLOW
+        elif backend == "sqlite":
+            options["max_overflow"] = max(THREADPOOL_SIZE - DB_POOL_SIZE, 0)
+        else:
+            options["max_overflow"] = 10
+        if backend == "sqlite" and asynchronous:
+            # aiosqlite defaults to opening a connection (and thread) per session
+            options["poolclass"] = AsyncAdaptedQueuePool
+
+    if backend == "sqlite":
+        # the driver's busy handler: how long to wait on a locked database.
+        # DB_STATEMENT_TIMEOUT is the closest SQLite equivalent, so it wins
+        options["connect_args"] = {
+            "timeout": (DB_STATEMENT_TIMEOUT or SQLITE_BUSY_TIMEOUT) / 1000
+        }
+        if not asynchronous:
+            options["connect_args"]["check_same_thread"] = False
+    elif backend == "postgresql" and DB_STATEMENT_TIMEOUT:
+        if asynchronous:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"
+            }
+
+    return options
+
+
+def sqlite_pragmas() -> list[str]:
+    """
+    PRAGMAs of the SQLite tuning profile, applied to every new connection
+    """
+    return [
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"mmap_size={SQLITE_MMAP_SIZE}",
+        "temp_store=MEMORY",
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    connect event listener applying the SQLite tuning profile
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def sqlite_tuning_enabled() -> bool:
+    return SQLITE_TUNING and database_backend(SQLALCHEMY_DATABASE_URL) == "sqlite"
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./peppermint.db"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)
+)
+if sqlite_tuning_enabled():
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
@@ -18,3 +142,72 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# asyncpg connections belong to the event loop that opened them, so every
+# loop gets its own async engine, closed when the loop shuts down: one per
+# worker process under uvicorn, one per request under the test client
+_async_sessionmakers: dict = {}
+
+
+async def dispose_on_loop_exit(async_engine) -> None:
+    """
+    waits for the event loop to shut down (which cancels every task), then
+    closes the engine's connections while the loop can still run
+    """
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        _async_sessionmakers.pop(asyncio.get_running_loop(), None)
+        await async_engine.dispose()
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """
+    returns the async sessionmaker of the running event loop, building its
+    engine on first use
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _async_sessionmakers:
+        async_engine = create_async_engine(
+            async_database_url(SQLALCHEMY_DATABASE_URL),
+            **engine_options(SQLALCHEMY_DATABASE_URL, asynchronous=True),
+        )
+        if sqlite_tuning_enabled():
+            event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+        factory = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+        closer = loop.create_task(dispose_on_loop_exit(async_engine))
+        _async_sessionmakers[loop] = (factory, closer)
+    return _async_sessionmakers[loop][0]
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    """
+    returns a snapshot of the sync engine's connection pool
+    """
+    pool = engine.pool
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        "status": pool.status(),
+    }
+
+
+def run_sqlite_maintenance() -> None:
+    """
+    Folds the WAL back into the database file and lets SQLite refresh the
+    query planner statistics it considers stale
+    """
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)")
+        connection.exec_driver_sql("PRAGMA optimize")
@@ -1,8 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
 from domain.account.account_schema import (
     AccountCreate,
     AccountUpdate,
 )
+from domain.transaction.transaction_checkpoint import remove_account_checkpoints
+from domain.transaction.transaction_rollup import remove_account_from_rollup
+from domain.user.user_version import bump_data_version
 from models import User, Account
 import uuid
 
@@ -21,10 +26,10 @@ def create_account(
         account_type=account_create.account_type,
         current_balance=account_create.current_balance,
         user_id=user.id,
-        user=user,
     )
 
     db.add(db_account)
+    bump_data_version(db, user.id)
     db.commit()
     return get_account_by_id(db, db_account.id)
 
@@ -42,6 +47,7 @@ def update_account(
     account.account_type = account_update.account_type
     account.current_balance = account_update.current_balance
     db.add(account)
+    bump_data_version(db, account.user_id)
     db.commit()
     return get_account_by_id(db, account.id)
 
@@ -53,23 +59,29 @@ def remove_account(
     """
     Deletes account
     """
+    remove_account_from_rollup(db, account)
+    remove_account_checkpoints(db, account.id)
+    bump_data_version(db, account.user_id)
     db.delete(account)
     db.commit()
 
 
 def account_balance_update(
     db: Session,
-    account: Account,
+    account_id: str,
     transaction_amount: float,
 ):
-    account = get_account_by_id(db, account.id)
-    account.current_balance += transaction_amount
-
-    # db.add(account) first location
-    account = get_account_by_id(db, account.id)
-    # test
-    db.add(account)
-    db.commit()
+    """
+    Adds an amount to an account's balance with one atomic UPDATE and returns
+    the new balance and the account's user_id, or None if there is no such
+    account. Does not commit
+    """
+    return db.execute(
+        update(Account)
+        .where(Account.id == account_id)
+        .values(current_balance=Account.current_balance + transaction_amount)
+        .returning(Account.current_balance, Account.user_id)
+    ).first()
 
 
 def get_account_by_id(
@@ -82,6 +94,10 @@ def get_account_by_id(
     return db.query(Account).filter(Account.id == id).first()
 
 
+def user_accounts_statement(user_id: str):
+    return select(Account).where(Account.user_id == user_id)
+
+
 def get_user_accounts(
     db: Session,
     user: User,
@@ -89,7 +105,20 @@ def get_user_accounts(
     """
     Retrieves list of accounts for a user
     """
-    accounts = db.query(Account).filter(Account.user_id == user.id).all()
+    accounts = db.scalars(user_accounts_statement(user.id)).all()
+    if not accounts:
+        return
+    return accounts
+
+
+async def get_user_accounts_async(
+    db: AsyncSession,
+    user: User,
+):
+    """
+    get_user_accounts on an async session
+    """
+    accounts = (await db.scalars(user_accounts_statement(user.id))).all()
     if not accounts:
         return
     return accounts
@@ -108,6 +137,12 @@ def get_all_accounts_by_user_id(
     return accounts
 
 
+def users_accounts_balance_statement(user_id: str):
+    return select(func.coalesce(func.sum(Account.current_balance), 0)).where(
+        Account.user_id == user_id
+    )
+
+
 def get_users_accounts_balance(
     db: Session,
     user_id: str,
@@ -115,11 +150,14 @@ def get_users_accounts_balance(
     """
     return all account's balances combined
     """
-    accounts_total = 0
-
-    accounts = get_all_accounts_by_user_id(db, user_id)
+    return db.scalar(users_accounts_balance_statement(user_id))
 
-    for account in accounts:
-        accounts_total += account.current_balance
 
-    return accounts_total
+async def get_users_accounts_balance_async(
+    db: AsyncSession,
+    user_id: str,
+):
+    """
+    get_users_accounts_balance on an async session
+    """
+    return await db.scalar(users_accounts_balance_statement(user_id))
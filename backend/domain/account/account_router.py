@@ -1,41 +1,57 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette import status
-from datetime import datetime, timedelta
-from database import get_db
+from datetime import date, datetime, timedelta
+from database import get_async_db, get_db
 from domain.account.account_crud import (
     create_account,
     update_account,
     remove_account,
     get_account_by_id,
-    get_user_accounts,
-    get_users_accounts_balance,
+    get_user_accounts_async,
+    get_users_accounts_balance_async,
 )
 from domain.user.user_crud import (
+    get_current_user_async,
     validate_user,
 )
 from domain.transaction.transaction_crud import (
     get_account_transactions_all,
-    get_all_transactions,
-    get_all_transactions_by_month,
+    get_all_transactions_async,
     get_expenses_total_for_month,
     get_monthly_expenses_by_category,
-    get_six_months_total_expenses,
-    sort_transactions_date,
+    get_monthly_total_expenses,
+    encode_transaction_cursor,
+    stream_user_transactions,
+    transaction_date_range,
 )
+from domain.transaction.transaction_checkpoint import get_balance_history
+from domain.transaction.transaction_export import iter_csv, iter_ndjson
+from domain.transaction.transaction_schema import TransactionResponse
 from domain.account.account_schema import (
     AccountCreate,
     AccountUpdate,
     AccountResponse,
+    BalancePoint,
 )
 from models import (
     User,
 )
 
 from domain.user.user_router import get_current_user
+from domain.user.user_version import conditional_get, conditional_get_async
 
-router = APIRouter(prefix="/peppermint/account")
+router = APIRouter(
+    prefix="/peppermint/account", dependencies=[Depends(conditional_get)]
+)
+# the hot read paths, served on the async session only; included before
+# router, whose /{id} would match them too
+async_router = APIRouter(
+    prefix="/peppermint/account", dependencies=[Depends(conditional_get_async)]
+)
 
 
 @router.post("/")
@@ -59,33 +75,77 @@ def account_create(
     )
 
 
-@router.get("/my_accounts")
-def account_get(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+@async_router.get("/my_accounts")
+async def account_get(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> list[AccountResponse] | None:
     """
     Gets all of user's accounts
     """
     validate_user(db, current_user)
-    return get_user_accounts(db, current_user)
+    return await get_user_accounts_async(db, current_user)
+
+
+@async_router.get("/all_transactions")
+async def account_get_all_transactions(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=500),
+    after: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> list[TransactionResponse]:
+    """
+    Gets user's transactions newest first. With limit, the cursor for the
+    next page is returned in the X-Next-Cursor header
+    """
+    validate_user(db, current_user)
+    all_transactions = await get_all_transactions_async(
+        db, current_user.id, limit, after
+    )
+    if limit and len(all_transactions) == limit:
+        response.headers["X-Next-Cursor"] = encode_transaction_cursor(
+            all_transactions[-1]
+        )
+    return all_transactions
 
 
-@router.get("/all_transactions")
-def account_get_all_transactions(
+@router.get("/transactions/export")
+def account_export_transactions(
+    format: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    date_from: datetime | date | None = Query(default=None, alias="from"),
+    date_to: datetime | date | None = Query(default=None, alias="to"),
+    account_id: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Streams user's transactions as CSV or NDJSON, optionally limited to
+    [from, to) and one account. A date-only `to` includes that day
+    """
     validate_user(db, current_user)
-    all_transactions = get_all_transactions(db, current_user.id)
-    return sort_transactions_date(all_transactions)
+    date_from, date_to = transaction_date_range(date_from, date_to)
+    # the db session stays open until the response has been sent
+    rows = stream_user_transactions(db, current_user.id, date_from, date_to, account_id)
+
+    if format == "csv":
+        return StreamingResponse(
+            iter_csv(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="transactions.csv"'},
+        )
+    return StreamingResponse(
+        iter_ndjson(rows),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="transactions.ndjson"'},
+    )
 
 
 @router.get("/expenses")
 def account_get_month_expenses(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> float:
     """
     get current month's expenses
     """
@@ -98,33 +158,46 @@ def account_get_month_expenses(
 def account_get_six_months_expenses(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> dict[str, float]:
     """
     get last six months' total expenses
     """
     today = datetime.today()
-    year, month, day = today.year, today.month, today.day
-    return get_six_months_total_expenses(db, current_user.id, year, month, day)
+    return get_monthly_total_expenses(db, current_user.id, today.year, today.month)
+
+
+@router.get("/expenses/monthly")
+def account_get_monthly_expenses(
+    months: int = Query(default=6, ge=1, le=120),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict[str, float]:
+    """
+    get total expenses for each of the last `months` months
+    """
+    today = datetime.today()
+    return get_monthly_total_expenses(
+        db, current_user.id, today.year, today.month, months
+    )
 
 
 @router.get("/expenses/by_category")
 def account_get_month_expenses_by_category(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> dict[str, float]:
     today = datetime.today()
     year, month = today.year, today.month
-    transactions = get_all_transactions_by_month(db, current_user.id, year, month)
-    return get_monthly_expenses_by_category(transactions)
+    return get_monthly_expenses_by_category(db, current_user.id, year, month)
 
 
-@router.get("/total_balances")
-def account_get_total_balances(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+@async_router.get("/total_balances")
+async def account_get_total_balances(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> float:
     validate_user(db, current_user)
-    return get_users_accounts_balance(db, current_user.id)
+    return await get_users_accounts_balance_async(db, current_user.id)
 
 
 @router.get("/{id}")
@@ -132,7 +205,7 @@ def one_account_get(
     id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> AccountResponse | None:
     validate_user(db, current_user)
     return get_account_by_id(db, id)
 
@@ -142,18 +215,45 @@ def get_account_transactions(
     account_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> list[TransactionResponse] | None:
     validate_user(db, current_user)
     return get_account_transactions_all(db, account_id)
 
 
+@router.get("/{account_id}/balance_history")
+def account_get_balance_history(
+    account_id: str,
+    date_from: datetime | date | None = Query(default=None, alias="from"),
+    date_to: datetime | date | None = Query(default=None, alias="to"),
+    step: str = Query(default="day", pattern="^(day|week|month)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> list[BalancePoint]:
+    """
+    Gets the account's balance at every step from `from` until `to`
+    (default: the last 30 days). A date-only `to` includes that day
+    """
+    validate_user(db, current_user)
+    account = get_account_by_id(db, account_id)
+    if not account or account.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found",
+        )
+
+    date_from, date_to = transaction_date_range(date_from, date_to)
+    date_to = date_to or datetime.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    return get_balance_history(db, account, date_from, date_to, step)
+
+
 @router.put("/{id}")
 def account_update(
     account_update: AccountUpdate,
     id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> AccountResponse:
     """
     Update account by id
     """
@@ -167,7 +267,7 @@ def account_remove(
     id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> None:
     """
     Delete account by id
     """
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, validator
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class AccountCreate(BaseModel):
@@ -6,7 +7,8 @@ class AccountCreate(BaseModel):
     account_type: str
     current_balance: float
 
-    @validator("institution", "account_type")
+    @field_validator("institution", "account_type")
+    @classmethod
     def not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError("This is a required field")
@@ -18,7 +20,8 @@ class AccountUpdate(BaseModel):
     account_type: str
     current_balance: float
 
-    @validator("institution", "account_type")
+    @field_validator("institution", "account_type")
+    @classmethod
     def not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError("This is a required field")
@@ -26,8 +29,17 @@ class AccountUpdate(BaseModel):
 
 
 class AccountResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     institution: str
     account_type: str
     current_balance: float
     user_id: str
+
+
+class BalancePoint(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    date: datetime
+    balance: float
@@ -0,0 +1,229 @@
+import copy
+import threading
+from collections import OrderedDict
+import numpy as np
+from sqlalchemy import BigInteger, type_coerce
+from sqlalchemy.orm import Session
+from starlette.config import Config
+from domain.user.user_version import get_data_version
+from models import Account, Transaction
+
+config = Config(".env")
+
+# bytes of numpy columns kept across all users, least recently used go first
+ANALYTICS_CACHE_BYTES = config(
+    "ANALYTICS_CACHE_BYTES", cast=int, default=64 * 1024 * 1024
+)
+
+
+def to_days(dates) -> np.ndarray:
+    """
+    returns dates / datetimes as int64 days since 1970-01-01
+    """
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+class TransactionColumns:
+    """
+    A user's transactions as numpy columns: date as int64 days since the
+    epoch, amount as int64 cents, category id (0 when uncategorized) and
+    account index. Capacity grows geometrically, so appends are amortized
+    """
+
+    def __init__(self, version: int | None, rows: list[tuple]):
+        self.version = version
+        self.account_ids = []
+        self._account_index = {}
+        self.size = 0
+        self._days = np.empty(0, dtype=np.int64)
+        self._cents = np.empty(0, dtype=np.int64)
+        self._categories = np.empty(0, dtype=np.int16)
+        self._accounts = np.empty(0, dtype=np.int32)
+        self.append(rows)
+
+    @property
+    def days(self) -> np.ndarray:
+        return self._days[: self.size]
+
+    @property
+    def cents(self) -> np.ndarray:
+        return self._cents[: self.size]
+
+    @property
+    def categories(self) -> np.ndarray:
+        return self._categories[: self.size]
+
+    @property
+    def accounts(self) -> np.ndarray:
+        return self._accounts[: self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.nbytes
+            for column in (self._days, self._cents, self._categories, self._accounts)
+        )
+
+    def _grow(self, size: int) -> None:
+        capacity = max(size, 2 * len(self._days), 64)
+        for name in ("_days", "_cents", "_categories", "_accounts"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self.size] = column[: self.size]
+            setattr(self, name, grown)
+
+    def account_index(self, account_id: str) -> int:
+        index = self._account_index.get(account_id)
+        if index is None:
+            index = self._account_index[account_id] = len(self.account_ids)
+            self.account_ids.append(account_id)
+        return index
+
+    def append(self, rows: list[tuple]) -> None:
+        """
+        appends (transaction_date, amount_cents, category_id, account_id) rows
+        """
+        if not rows:
+            return
+        dates, cents, category_ids, account_ids = zip(*rows)
+        size = self.size + len(rows)
+        if size > len(self._days):
+            self._grow(size)
+
+        new = slice(self.size, size)
+        self._days[new] = to_days(dates)
+        self._cents[new] = cents
+        self._categories[new] = [category_id or 0 for category_id in category_ids]
+        self._accounts[new] = [self.account_index(a) for a in account_ids]
+        self.size = size
+
+    def appended(self, version: int, rows: list[tuple]) -> "TransactionColumns":
+        """
+        returns a copy with rows appended. The copy shares the arrays but only
+        writes past this one's size, so readers of this one are unaffected
+        """
+        columns = copy.copy(self)
+        columns.version = version
+        columns.append(rows)
+        return columns
+
+
+def load_transaction_columns(db: Session, user_id: str) -> TransactionColumns:
+    """
+    Builds a user's columns from one query. Their version is None when the
+    user's data changed while reading, as the rows may not match either one
+    """
+    version = get_data_version(db, user_id)
+    rows = (
+        db.query(
+            Transaction.transaction_date,
+            type_coerce(Transaction.transaction_amount, BigInteger),
+            Transaction.category_id,
+            Transaction.account_id,
+        )
+        .join(Account, Transaction.account_id == Account.id)
+        .filter(Account.user_id == user_id)
+        .all()
+    )
+    if get_data_version(db, user_id) != version:
+        version = None
+    return TransactionColumns(version, rows)
+
+
+class TransactionColumnCache:
+    """
+    LRU of users' TransactionColumns under a byte budget. Entries are checked
+    against the user's data version, so writes from any process are seen;
+    this process's transaction creates are appended instead of rebuilding
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.builds = 0
+        self.appends = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: str) -> TransactionColumns:
+        """
+        returns the user's columns, rebuilding them when stale or missing
+        """
+        version = get_data_version(db, user_id)
+        with self._lock:
+            columns = self._entries.get(user_id)
+            if columns is not None and columns.version == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return columns
+
+        columns = load_transaction_columns(db, user_id)
+        with self._lock:
+            self.builds += 1
+        if columns.version is not None:
+            self.put(user_id, columns)
+        return columns
+
+    def put(self, user_id: str, columns: TransactionColumns) -> None:
+        with self._lock:
+            self._remove(user_id)
+            if columns.nbytes > self.max_bytes:
+                return
+            self._entries[user_id] = columns
+            self._bytes += columns.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def append(self, user_id: str, version: int | None, rows: list[tuple]) -> None:
+        """
+        Appends a committed write's rows when the cached columns are exactly
+        one version behind it; otherwise drops them to be rebuilt
+        """
+        with self._lock:
+            columns = self._entries.get(user_id)
+            if columns is None:
+                return
+            if version is None or columns.version != version - 1:
+                self._remove(user_id)
+                return
+            self._bytes -= columns.nbytes
+            columns = self._entries[user_id] = columns.appended(version, rows)
+            self._entries.move_to_end(user_id)
+            self._bytes += columns.nbytes
+            self.appends += 1
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _remove(self, user_id: str) -> None:
+        columns = self._entries.pop(user_id, None)
+        if columns is not None:
+            self._bytes -= columns.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "builds": self.builds,
+                "appends": self.appends,
+                "users": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+transaction_columns = TransactionColumnCache(ANALYTICS_CACHE_BYTES)
+
+
+def get_transaction_column_cache_stats() -> dict:
+    """
+    returns the columnar cache's hit/build/append counters and size
+    """
+    return transaction_columns.stats()
@@ -0,0 +1,177 @@
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from starlette import status
+from fastapi import HTTPException
+from domain.analytics.analytics_cache import to_days, transaction_columns
+from domain.category.category_crud import (
+    get_category_name,
+    get_non_expense_category_ids,
+)
+from domain.transaction.transaction_checkpoint import BALANCE_STEPS
+from models import Account, Money, Transaction
+
+SPENDING_GROUPS = {
+    "category": Transaction.category_id,
+    "account": Transaction.account_id,
+}
+MAX_SPENDING_BUCKETS = 1000
+
+
+def bucket_start(at: datetime, granularity: str) -> date:
+    """
+    returns the first day of the day / week (Monday) / month containing at
+    """
+    day = at.date()
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_column(db: Session, granularity: str):
+    """
+    returns the SQL expression of a transaction's bucket start date, the
+    same buckets as bucket_start
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date(func.date_trunc(granularity, Transaction.transaction_date))
+    modifiers = {
+        "day": (),
+        "week": ("weekday 0", "-6 days"),
+        "month": ("start of month",),
+    }
+    return func.date(Transaction.transaction_date, *modifiers[granularity])
+
+
+def count_buckets(date_from: datetime, date_to: datetime, granularity: str) -> int:
+    """
+    returns how many buckets [date_from, date_to) spans, 400 if the range
+    is empty or there are more than MAX_SPENDING_BUCKETS
+    """
+    if date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from must be before to",
+        )
+
+    first = bucket_start(date_from, granularity)
+    # the bucket of the last instant before the exclusive end
+    last = bucket_start(date_to - timedelta(microseconds=1), granularity)
+    buckets = 1
+    while first + BALANCE_STEPS[granularity] * buckets <= last:
+        buckets += 1
+        if buckets > MAX_SPENDING_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Range has more than {MAX_SPENDING_BUCKETS} buckets, "
+                "use a larger granularity",
+            )
+    return buckets
+
+
+def get_spending(
+    db: Session,
+    user_id: str,
+    date_from: datetime,
+    date_to: datetime,
+    granularity: str,
+    group_by: str,
+) -> list[dict]:
+    """
+    returns a user's spending (no income, credit, transfer) from date_from up
+    to, not including, date_to per bucket and category or account, from one
+    GROUP BY query. Buckets without spending are left out
+    """
+    count_buckets(date_from, date_to, granularity)
+
+    bucket = bucket_column(db, granularity)
+    group = SPENDING_GROUPS[group_by]
+    rows = (
+        db.query(
+            bucket,
+            group,
+            func.sum(func.abs(Transaction.transaction_amount, type_=Money)),
+            func.count(Transaction.id),
+        )
+        .join(Account, Transaction.account_id == Account.id)
+        .filter(
+            Account.user_id == user_id,
+            Transaction.transaction_date >= date_from,
+            Transaction.transaction_date < date_to,
+            or_(
+                Transaction.category_id.is_(None),
+                Transaction.category_id.notin_(get_non_expense_category_ids(db)),
+            ),
+        )
+        .group_by(bucket, group)
+        .all()
+    )
+
+    spending = [
+        {
+            "period": date.fromisoformat(str(period)[:10]),
+            "group": get_category_name(key, db) if group_by == "category" else key,
+            "total": total,
+            "count": count,
+        }
+        for period, key, total, count in rows
+    ]
+    return sorted(spending, key=lambda item: (item["period"], item["group"]))
+
+
+def get_spending_stats(
+    db: Session, user_id: str, date_from: datetime, date_to: datetime, window: int
+) -> dict:
+    """
+    returns spending statistics (no income, credit, transfer) for the days
+    in [date_from, date_to), counted like count_buckets: total, count, daily
+    and `window`-day rolling averages, totals by category and percentiles of
+    the amounts.
+    Computed with numpy over the user's cached transaction columns
+    """
+    day_count = count_buckets(date_from, date_to, "day")
+    columns = transaction_columns.get(db, user_id)
+    first_day, last_day = to_days([date_from, date_to - timedelta(microseconds=1)])
+    window_start = first_day - (window - 1)
+
+    days, categories = columns.days, columns.categories
+    spent = np.abs(columns.cents)
+    expense = ~np.isin(categories, get_non_expense_category_ids(db))
+    in_window = expense & (days >= window_start) & (days <= last_day)
+    in_range = in_window & (days >= first_day)
+
+    daily = np.bincount(
+        days[in_window] - window_start,
+        weights=spent[in_window],
+        minlength=day_count + window - 1,
+    )
+    running = np.concatenate(([0.0], np.cumsum(daily)))
+    rolling = (running[window:] - running[:-window]) / window / 100
+    dates = np.arange(first_day, last_day + 1).astype("datetime64[D]").tolist()
+
+    range_spent = spent[in_range]
+    by_category = np.bincount(categories[in_range], weights=range_spent)
+    percentiles = {}
+    if range_spent.size:
+        values = np.percentile(range_spent, [50, 90, 99]) / 100
+        percentiles = {"p50": values[0], "p90": values[1], "p99": values[2]}
+
+    total = int(range_spent.sum()) / 100
+    return {
+        "total": total,
+        "count": int(range_spent.size),
+        "daily_average": round(total / day_count, 2),
+        "by_category": {
+            get_category_name(category_id, db): round(category_total / 100, 2)
+            for category_id, category_total in enumerate(by_category)
+            if category_total
+        },
+        "percentiles": {name: round(value, 2) for name, value in percentiles.items()},
+        "rolling_average": [
+            {"date": day, "average": round(average, 2)}
+            for day, average in zip(dates, rolling)
+        ],
+    }
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Query
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from database import get_db
+from domain.analytics.analytics_crud import get_spending, get_spending_stats
+from domain.analytics.analytics_schema import SpendingBucket, SpendingStats
+from domain.transaction.transaction_crud import transaction_date_range
+from domain.user.user_crud import (
+    validate_user,
+)
+from models import (
+    User,
+)
+
+from domain.user.user_router import get_current_user
+from domain.user.user_version import conditional_get
+
+router = APIRouter(
+    prefix="/peppermint/analytics", dependencies=[Depends(conditional_get)]
+)
+
+
+@router.get("/spending")
+def analytics_get_spending(
+    date_from: datetime | date | None = Query(default=None, alias="from"),
+    date_to: datetime | date | None = Query(default=None, alias="to"),
+    granularity: str = Query(default="day", pattern="^(day|week|month)$"),
+    group_by: str = Query(default="category", pattern="^(category|account)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> list[SpendingBucket]:
+    """
+    Gets spending in [from, to) (default: the last 30 days) per day, week or
+    month and per category or account. A date-only `to` includes that day
+    """
+    validate_user(db, current_user)
+    date_from, date_to = transaction_date_range(date_from, date_to)
+    date_to = date_to or datetime.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    return get_spending(db, current_user.id, date_from, date_to, granularity, group_by)
+
+
+@router.get("/stats")
+def analytics_get_spending_stats(
+    date_from: datetime | date | None = Query(default=None, alias="from"),
+    date_to: datetime | date | None = Query(default=None, alias="to"),
+    window: int = Query(default=7, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> SpendingStats:
+    """
+    Gets spending totals, averages, a `window`-day rolling average and
+    percentiles for the days in [from, to) (default: the last 30 days). A
+    date-only `to` includes that day
+    """
+    validate_user(db, current_user)
+    date_from, date_to = transaction_date_range(date_from, date_to)
+    date_to = date_to or datetime.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    return get_spending_stats(db, current_user.id, date_from, date_to, window)
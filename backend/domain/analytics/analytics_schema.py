@@ -0,0 +1,23 @@
+from datetime import date
+from pydantic import BaseModel
+
+
+class SpendingBucket(BaseModel):
+    period: date
+    group: str
+    total: float
+    count: int
+
+
+class RollingAverage(BaseModel):
+    date: date
+    average: float
+
+
+class SpendingStats(BaseModel):
+    total: float
+    count: int
+    daily_average: float
+    by_category: dict[str, float]
+    percentiles: dict[str, float]
+    rolling_average: list[RollingAverage]
@@ -1,13 +1,24 @@
+from sqlalchemy import and_, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from domain.budget.budget_schema import (
     BudgetCreate,
     BudgetUpdate,
 )
-from models import User, Budget
+from domain.category.category_crud import get_category_id, get_category_name
+from domain.user.user_version import bump_data_version, get_data_version
+from models import User, Budget, MonthlyCategoryTotal, to_cents
+from starlette import status
+from fastapi import HTTPException
+from collections import OrderedDict
+import threading
 import uuid
 
+BUDGET_CATEGORY_CACHE_SIZE = 1024
 
-current_budgets = set()
+# user_id -> (data_version, {budget_category: budget_id}), least recently used first
+_budget_categories = OrderedDict()
+_budget_categories_lock = threading.Lock()
 
 
 def create_budget(
@@ -20,14 +31,14 @@ def create_budget(
     """
     db_budget = Budget(
         id=str(uuid.uuid4()),
-        budget_category=budget_create.budget_category,
+        category_id=get_category_id(db, budget_create.budget_category),
         budget_amount=budget_create.budget_amount,
         user_id=user.id,
-        user=user,
     )
 
     db.add(db_budget)
-    db.commit()
+    bump_data_version(db, user.id)
+    commit_budget(db, user.id)
     return get_budget_by_id(db, db_budget.id)
 
 
@@ -40,10 +51,11 @@ def update_budget(
     Update budget
     """
     budget = get_budget_by_id(db, budget.id)
-    budget.budget_category = budget_update.budget_category
+    budget.category_id = get_category_id(db, budget_update.budget_category)
     budget.budget_amount = budget_update.budget_amount
     db.add(budget)
-    db.commit()
+    bump_data_version(db, budget.user_id)
+    commit_budget(db, budget.user_id)
     return get_budget_by_id(db, budget.id)
 
 
@@ -54,8 +66,10 @@ def remove_budget(
     """
     Delete budget
     """
+    bump_data_version(db, budget.user_id)
     db.delete(budget)
     db.commit()
+    invalidate_budget_categories(budget.user_id)
 
 
 def get_budget_by_id(
@@ -83,22 +97,98 @@ def get_user_budgets(
     return budgets
 
 
-def validate_budget(category):
-
-    if category in current_budgets:
-        return False
-    return True
-
-
-def add_current_budget(category):
-    current_budgets.add(category)
-
-
-def update_current_budgets(old_category, new_category):
-    current_budgets.add(new_category)
-    current_budgets.remove(old_category)
-
+def get_budget_progress(db: Session, user_id: str, year_month: str) -> list[dict]:
+    """
+    returns each of the user's budgets with the month's spending in its
+    category, from one LEFT JOIN of budget against the monthly totals
+    """
+    spent_column = func.coalesce(MonthlyCategoryTotal.total, 0)
+    rows = (
+        db.query(Budget, spent_column)
+        .outerjoin(
+            MonthlyCategoryTotal,
+            and_(
+                MonthlyCategoryTotal.user_id == Budget.user_id,
+                MonthlyCategoryTotal.year_month == year_month,
+                MonthlyCategoryTotal.category_id == Budget.category_id,
+            ),
+        )
+        .filter(Budget.user_id == user_id)
+        .all()
+    )
 
-def remove_from_current_budgets(category):
-    if category in current_budgets:
-        current_budgets.remove(category)
+    progress = []
+    for budget, spent in sorted(rows, key=lambda row: row[0].budget_category):
+        budget_cents, spent_cents = to_cents(budget.budget_amount), to_cents(spent)
+        progress.append(
+            {
+                "id": budget.id,
+                "budget_category": budget.budget_category,
+                "budget_amount": budget.budget_amount,
+                "spent": spent,
+                "remaining": (budget_cents - spent_cents) / 100,
+                "percent_used": (
+                    round(spent_cents * 100 / budget_cents, 1) if budget_cents else None
+                ),
+            }
+        )
+    return progress
+
+
+def commit_budget(db: Session, user_id: str) -> None:
+    """
+    Commits a budget insert/update, 409 if the user already has a budget
+    for the category
+    """
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A budget for this category already exists.",
+        )
+    finally:
+        invalidate_budget_categories(user_id)
+
+
+def get_budget_categories(db: Session, user_id: str) -> dict[str, str]:
+    """
+    returns the user's {budget_category: budget_id}. Cached per process and
+    checked against the user's data version, so changes made by other
+    workers are seen on the next call
+    """
+    version = get_data_version(db, user_id)
+    with _budget_categories_lock:
+        cached = _budget_categories.get(user_id)
+        if cached and cached[0] == version:
+            _budget_categories.move_to_end(user_id)
+            return cached[1]
+
+    rows = db.query(Budget.category_id, Budget.id).filter(Budget.user_id == user_id)
+    categories = {
+        get_category_name(category_id, db): budget_id for category_id, budget_id in rows
+    }
+    with _budget_categories_lock:
+        _budget_categories[user_id] = (version, categories)
+        _budget_categories.move_to_end(user_id)
+        while len(_budget_categories) > BUDGET_CATEGORY_CACHE_SIZE:
+            _budget_categories.popitem(last=False)
+    return categories
+
+
+def invalidate_budget_categories(user_id: str) -> None:
+    with _budget_categories_lock:
+        _budget_categories.pop(user_id, None)
+
+
+def validate_budget(db: Session, user_id: str, category: str) -> None:
+    """
+    409 if the user already has a budget for the category. The unique
+    (user_id, budget_category) constraint still guards concurrent writes
+    """
+    if category in get_budget_categories(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A budget for this category already exists.",
+        )
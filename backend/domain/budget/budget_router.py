@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from fastapi import Depends
+from fastapi import Depends, Query
 from sqlalchemy.orm import Session
 from starlette import status
 from database import get_db
@@ -10,9 +10,7 @@ from domain.budget.budget_crud import (
     remove_budget,
     get_budget_by_id,
     get_user_budgets,
-    add_current_budget,
-    remove_from_current_budgets,
-    update_current_budgets,
+    get_budget_progress,
     validate_budget,
 )
 from domain.user.user_crud import (
@@ -22,12 +20,12 @@ from domain.budget.budget_schema import (
     BudgetCreate,
     BudgetUpdate,
     BudgetResponse,
+    BudgetProgress,
 )
 
 from domain.transaction.transaction_crud import (
     get_all_transactions,
     get_transaction_balances_by_category,
-    get_all_transactions_by_month,
 )
 
 from models import (
@@ -35,8 +33,9 @@ from models import (
 )
 
 from domain.user.user_router import get_current_user
+from domain.user.user_version import conditional_get
 
-router = APIRouter(prefix="/peppermint/budget")
+router = APIRouter(prefix="/peppermint/budget", dependencies=[Depends(conditional_get)])
 
 
 @router.post("/")
@@ -49,11 +48,8 @@ def budget_create(
     Create budget
     """
     # validate_user(db, current_user)
-    validate = validate_budget(budget_create.budget_category)
-    if not validate:
-        raise Exception
-    add_current_budget(budget_create.budget_category)
-    
+    validate_budget(db, current_user.id, budget_create.budget_category)
+
     new_budget = create_budget(db, budget_create=budget_create, user=current_user)
 
     return BudgetResponse(
@@ -68,7 +64,7 @@ def budget_create(
 def budget_get(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> list[BudgetResponse] | None:
     """
     Get all of user's budgets
     """
@@ -80,15 +76,29 @@ def budget_get(
 def get_current_balance(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> dict[str, float]:
     """
     return current balances
     """
     # transactions = get_all_transactions(db, current_user.id)
     today = datetime.today()
     year, month = today.year, today.month
-    transactions = get_all_transactions_by_month(db, current_user.id, year, month)
-    return get_transaction_balances_by_category(transactions)
+    return get_transaction_balances_by_category(db, current_user.id, year, month)
+
+
+@router.get("/progress")
+def budget_progress_get(
+    month: str | None = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> list[BudgetProgress]:
+    """
+    Get each budget with spent, remaining and percent used for month
+    (YYYY-MM), the current month by default
+    """
+    if month is None:
+        month = datetime.today().strftime("%Y-%m")
+    return get_budget_progress(db, current_user.id, month)
 
 
 @router.get("/{id}")
@@ -96,7 +106,7 @@ def one_budget_get(
     id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> BudgetResponse | None:
     # validate_user(current_user)
     return get_budget_by_id(db, id)
 
@@ -107,7 +117,7 @@ def budget_update(
     id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> BudgetResponse:
     """
     update budget by id
     """
@@ -118,10 +128,7 @@ def budget_update(
     new_category = budget_update.budget_category
 
     if old_category != new_category:
-        valid_category = validate_budget(new_category)
-        if not valid_category:
-            raise Exception
-        update_current_budgets(old_category, new_category)
+        validate_budget(db, budget.user_id, new_category)
     return update_budget(db, budget_update, budget)
 
 
@@ -130,11 +137,10 @@ def budget_remove(
     id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> None:
     """
     delete budget by id
     """
     # validate_user(current_user)
     budget = get_budget_by_id(db, id)
-    remove_from_current_budgets(budget.budget_category)
     return remove_budget(db, budget)
@@ -1,18 +1,58 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
+from domain.category.category_crud import is_known_category
 
 
 class BudgetCreate(BaseModel):
     budget_category: str
     budget_amount: float
 
+    @field_validator("budget_category")
+    @classmethod
+    def not_empty(cls, v):
+        if not v or not v.strip():
+            raise ValueError("This is a required field")
+        return v
+
+    @field_validator("budget_category")
+    @classmethod
+    def known_category(cls, v):
+        if not is_known_category(v):
+            raise ValueError("Unknown category")
+        return v
+
 
 class BudgetUpdate(BaseModel):
     budget_category: str
     budget_amount: float
 
+    @field_validator("budget_category")
+    @classmethod
+    def not_empty(cls, v):
+        if not v or not v.strip():
+            raise ValueError("This is a required field")
+        return v
+
+    @field_validator("budget_category")
+    @classmethod
+    def known_category(cls, v):
+        if not is_known_category(v):
+            raise ValueError("Unknown category")
+        return v
+
 
 class BudgetResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     budget_category: str
     budget_amount: float
     user_id: str
+
+
+class BudgetProgress(BaseModel):
+    id: str
+    budget_category: str
+    budget_amount: float
+    spent: float
+    remaining: float
+    percent_used: float | None
@@ -0,0 +1,143 @@
+import threading
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette import status
+from models import Category
+
+# seeded by migration 0008
+DEFAULT_CATEGORIES = {
+    "auto-transport": True,
+    "bills-utilities": True,
+    "credit": False,
+    "education": True,
+    "fees-charges": True,
+    "food-restaurants": True,
+    "gas": True,
+    "groceries": True,
+    "health-fitness": True,
+    "income": False,
+    "misc": True,
+    "mortgage-rent": True,
+    "personal care": True,
+    "pets": True,
+    "refund": True,
+    "shopping": True,
+    "transfer": False,
+}
+
+
+class CategoryRegistry:
+    """
+    In-process map between category names and ids. Categories only come
+    from migrations and are never renamed or removed, so the table is read
+    once per process
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._categories = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        rows = db.query(Category.id, Category.name, Category.is_expense).all()
+        with self._lock:
+            for category_id, name, is_expense in rows:
+                self._ids[name] = category_id
+                self._categories[category_id] = (name, is_expense)
+            self._loaded = True
+
+    def ensure_loaded(self, db: Session | None = None) -> None:
+        if self._loaded:
+            return
+        if db is not None:
+            self.load(db)
+        else:
+            from database import SessionLocal
+
+            with SessionLocal() as session:
+                self.load(session)
+
+    def get_id(self, name: str) -> int | None:
+        return self._ids.get(name)
+
+    def get(self, category_id: int) -> tuple[str, bool] | None:
+        return self._categories.get(category_id)
+
+    def non_expense_ids(self) -> list[int]:
+        with self._lock:
+            return sorted(
+                category_id
+                for category_id, (_, is_expense) in self._categories.items()
+                if not is_expense
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._categories.clear()
+            self._loaded = False
+
+
+category_registry = CategoryRegistry()
+
+
+def is_known_category(name: str) -> bool:
+    """
+    returns whether a category name is in the registry, for validating
+    request bodies before they reach the database
+    """
+    category_registry.ensure_loaded()
+    return category_registry.get_id(name) is not None
+
+
+def get_category_id(db: Session, name: str | None) -> int | None:
+    """
+    returns the id of a category name, None for "" (uncategorized).
+    Unknown names are rejected, the category table is not user writable
+    """
+    if not name:
+        return None
+    category_registry.ensure_loaded(db)
+    category_id = category_registry.get_id(name)
+    if category_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown category: {name}",
+        )
+    return category_id
+
+
+def lookup_category(category_id: int, db: Session | None = None) -> tuple[str, bool]:
+    """
+    returns (name, is_expense) of a category id
+    """
+    category_registry.ensure_loaded(db)
+    return category_registry.get(category_id) or ("", True)
+
+
+def get_category_name(category_id: int | None, db: Session | None = None) -> str:
+    """
+    returns the name of a category id, "" when uncategorized
+    """
+    if not category_id:
+        return ""
+    return lookup_category(category_id, db)[0]
+
+
+def category_is_expense(category_id: int | None, db: Session | None = None) -> bool:
+    """
+    returns whether a category counts as spending; uncategorized does
+    """
+    if not category_id:
+        return True
+    return lookup_category(category_id, db)[1]
+
+
+def get_non_expense_category_ids(db: Session) -> list[int]:
+    """
+    returns the ids of the income-like categories (income, credit, transfer)
+    for filtering expenses with an integer predicate
+    """
+    category_registry.ensure_loaded(db)
+    return category_registry.non_expense_ids()
@@ -0,0 +1,110 @@
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from sqlalchemy.orm import Session
+from starlette import status
+from fastapi import HTTPException
+from domain.category.category_crud import category_is_expense
+from domain.transaction.transaction_crud import (
+    balances_by_category,
+    expenses_by_category,
+    format_date,
+)
+from domain.transaction.transaction_rollup import (
+    get_category_totals_by_month,
+    rollup_key,
+)
+from models import Account, Budget, User, to_cents
+
+DASHBOARD_SECTIONS = (
+    "accounts",
+    "total_balances",
+    "expenses",
+    "six_months",
+    "by_category",
+    "budgets",
+    "current_balances",
+)
+ROLLUP_SECTIONS = {"expenses", "six_months", "by_category", "current_balances"}
+
+
+def parse_dashboard_sections(include: str | None) -> set[str]:
+    """
+    returns the requested sections of a comma separated include=, all if empty
+    """
+    if not include:
+        return set(DASHBOARD_SECTIONS)
+
+    sections = {section.strip() for section in include.split(",") if section.strip()}
+    unknown = sections.difference(DASHBOARD_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(sorted(unknown))}. "
+            f"Choose from: {', '.join(DASHBOARD_SECTIONS)}",
+        )
+    return sections
+
+
+def expenses_total(totals: dict[int, float]) -> float:
+    """
+    returns a month's expenses (no income, credit, transfer) from
+    {category_id: total}
+    """
+    return (
+        sum(
+            to_cents(total)
+            for category_id, total in totals.items()
+            if category_is_expense(category_id)
+        )
+        / 100
+    )
+
+
+def get_dashboard(
+    db: Session, user: User, year: int, month: int, sections: set[str]
+) -> dict:
+    """
+    Builds the dashboard sections for a user's month: one accounts query,
+    one budgets query and one read of the monthly rollup, shared by every
+    section derived from it
+    """
+    dashboard = {}
+
+    if sections & {"accounts", "total_balances"}:
+        accounts = db.query(Account).filter(Account.user_id == user.id).all()
+        if "accounts" in sections:
+            dashboard["accounts"] = accounts
+        if "total_balances" in sections:
+            dashboard["total_balances"] = (
+                sum(to_cents(account.current_balance) for account in accounts) / 100
+            )
+
+    if "budgets" in sections:
+        dashboard["budgets"] = db.query(Budget).filter(Budget.user_id == user.id).all()
+
+    if sections & ROLLUP_SECTIONS:
+        current_month = datetime(year, month, 1)
+        months = 6 if "six_months" in sections else 1
+        first_month = current_month - relativedelta(months=months - 1)
+        totals_by_month = get_category_totals_by_month(
+            db, user.id, first_month, current_month
+        )
+        totals = totals_by_month.get(rollup_key(current_month, None)[0], {})
+
+        if "expenses" in sections:
+            dashboard["expenses"] = expenses_total(totals)
+        if "six_months" in sections:
+            six_months = {}
+            for i in range(months):
+                date = current_month - relativedelta(months=i)
+                month_totals = totals_by_month.get(rollup_key(date, None)[0], {})
+                six_months[format_date(date.year, date.month)] = expenses_total(
+                    month_totals
+                )
+            dashboard["six_months"] = six_months
+        if "by_category" in sections:
+            dashboard["by_category"] = expenses_by_category(totals)
+        if "current_balances" in sections:
+            dashboard["current_balances"] = balances_by_category(totals)
+
+    return dashboard
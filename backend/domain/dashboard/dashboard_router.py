@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from datetime import datetime
+from database import get_db
+from domain.dashboard.dashboard_crud import (
+    get_dashboard,
+    parse_dashboard_sections,
+)
+from domain.dashboard.dashboard_schema import DashboardResponse
+from domain.user.user_crud import (
+    validate_user,
+)
+from models import (
+    User,
+)
+
+from domain.user.user_router import get_current_user
+from domain.user.user_version import conditional_get
+
+router = APIRouter(
+    prefix="/peppermint/dashboard", dependencies=[Depends(conditional_get)]
+)
+
+
+@router.get("", response_model_exclude_unset=True)
+def dashboard_get(
+    include: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> DashboardResponse:
+    """
+    Gets the dashboard's accounts, balances, expenses and budgets for the
+    current month in one request. include= takes a comma separated subset of
+    accounts, total_balances, expenses, six_months, by_category, budgets,
+    current_balances
+    """
+    validate_user(db, current_user)
+    sections = parse_dashboard_sections(include)
+    today = datetime.today()
+    return get_dashboard(db, current_user, today.year, today.month, sections)
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from domain.account.account_schema import AccountResponse
+from domain.budget.budget_schema import BudgetResponse
+
+
+class DashboardResponse(BaseModel):
+    """
+    Sections left out of include= are left out of the response
+    """
+
+    accounts: list[AccountResponse] | None = None
+    total_balances: float | None = None
+    expenses: float | None = None
+    six_months: dict[str, float] | None = None
+    by_category: dict[str, float] | None = None
+    budgets: list[BudgetResponse] | None = None
+    current_balances: dict[str, float] | None = None
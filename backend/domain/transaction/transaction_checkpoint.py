@@ -0,0 +1,263 @@
+import argparse
+from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session
+from starlette import status
+from fastapi import HTTPException
+from domain.transaction.transaction_rollup import dialect_insert
+from models import Account, BalanceCheckpoint, Transaction
+
+BALANCE_STEPS = {
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": relativedelta(months=1),
+}
+MAX_BALANCE_POINTS = 1000
+
+
+def checkpoint_period(transaction_date: datetime) -> datetime:
+    """
+    returns the start of the checkpoint period (month) containing a date
+    """
+    return datetime(transaction_date.year, transaction_date.month, 1)
+
+
+def add_checkpoint_delta(
+    deltas: dict,
+    transaction_date: datetime,
+    amount: float,
+    count: int = 1,
+) -> None:
+    """
+    Accumulates a transaction into a deltas dict. Use count=-1 to take it out
+    """
+    period = checkpoint_period(transaction_date)
+    net_amount, period_count = deltas.get(period, (0.0, 0))
+    deltas[period] = (net_amount + count * amount, period_count + count)
+
+
+def apply_checkpoint_deltas(db: Session, account_id: str, deltas: dict) -> None:
+    """
+    Upserts accumulated deltas into the account's balance checkpoints and
+    moves the running totals of the months after each one along with it.
+    Does not commit, so it shares the caller's database transaction
+    """
+    if not deltas:
+        return
+
+    insert = dialect_insert(db)
+    # oldest first, so a new month's running total starts from the already
+    # updated month before it
+    for period_start, (net_amount, count) in sorted(deltas.items()):
+        db.query(BalanceCheckpoint).filter(
+            BalanceCheckpoint.account_id == account_id,
+            BalanceCheckpoint.period_start > period_start,
+        ).update(
+            {
+                BalanceCheckpoint.cumulative_amount: BalanceCheckpoint.cumulative_amount
+                + net_amount
+            },
+            synchronize_session=False,
+        )
+
+        previous_cumulative = (
+            select(BalanceCheckpoint.cumulative_amount)
+            .where(
+                BalanceCheckpoint.account_id == account_id,
+                BalanceCheckpoint.period_start < period_start,
+            )
+            .order_by(BalanceCheckpoint.period_start.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        statement = insert(BalanceCheckpoint).values(
+            account_id=account_id,
+            period_start=period_start,
+            net_amount=net_amount,
+            count=count,
+            cumulative_amount=func.coalesce(previous_cumulative, 0) + net_amount,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["account_id", "period_start"],
+            set_={
+                "net_amount": BalanceCheckpoint.net_amount
+                + statement.excluded.net_amount,
+                "count": BalanceCheckpoint.count + statement.excluded.count,
+                "cumulative_amount": BalanceCheckpoint.cumulative_amount
+                + statement.excluded.net_amount,
+            },
+        )
+        db.execute(statement)
+
+    if any(count < 0 for _, count in deltas.values()):
+        db.query(BalanceCheckpoint).filter(
+            BalanceCheckpoint.account_id == account_id,
+            BalanceCheckpoint.count <= 0,
+        ).delete(synchronize_session=False)
+
+
+def remove_account_checkpoints(db: Session, account_id: str) -> None:
+    db.query(BalanceCheckpoint).filter(
+        BalanceCheckpoint.account_id == account_id
+    ).delete(synchronize_session=False)
+
+
+def rebuild_checkpoints(db: Session, account_id: str | None = None) -> None:
+    """
+    Recomputes balance checkpoints from the transaction table, for one
+    account or all of them, and commits
+    """
+    stale = db.query(BalanceCheckpoint)
+    criteria = []
+    if account_id:
+        stale = stale.filter(BalanceCheckpoint.account_id == account_id)
+        criteria.append(Transaction.account_id == account_id)
+    stale.delete(synchronize_session=False)
+
+    year_column = extract("year", Transaction.transaction_date)
+    month_column = extract("month", Transaction.transaction_date)
+    rows = (
+        db.query(
+            Transaction.account_id,
+            year_column,
+            month_column,
+            func.sum(Transaction.transaction_amount),
+            func.count(Transaction.id),
+        )
+        .filter(Transaction.account_id.is_not(None), *criteria)
+        .group_by(Transaction.account_id, year_column, month_column)
+        .all()
+    )
+
+    deltas_by_account = {}
+    for row_account_id, year, month, net_amount, count in rows:
+        deltas = deltas_by_account.setdefault(row_account_id, {})
+        deltas[datetime(int(year), int(month), 1)] = (net_amount, count)
+
+    for row_account_id, deltas in deltas_by_account.items():
+        apply_checkpoint_deltas(db, row_account_id, deltas)
+
+    db.commit()
+
+
+def balance_points(date_from: datetime, date_to: datetime, step: str) -> list:
+    """
+    returns date_from and every step after it, before date_to
+    """
+    if date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from must be before to",
+        )
+
+    points = []
+    point = date_from
+    while point < date_to:
+        if len(points) == MAX_BALANCE_POINTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Range has more than {MAX_BALANCE_POINTS} points, use a larger step",
+            )
+        points.append(point)
+        point = date_from + BALANCE_STEPS[step] * len(points)
+    return points
+
+
+def latest_cumulative(account_id: str, before: datetime | None = None):
+    """
+    returns a scalar subquery for the running total of the account's latest
+    checkpoint, or of its latest one before a month; 0 when there is none
+    """
+    statement = select(BalanceCheckpoint.cumulative_amount).where(
+        BalanceCheckpoint.account_id == account_id
+    )
+    if before is not None:
+        statement = statement.where(BalanceCheckpoint.period_start < before)
+    statement = statement.order_by(BalanceCheckpoint.period_start.desc()).limit(1)
+    return func.coalesce(statement.scalar_subquery(), 0)
+
+
+def get_balance_at(db: Session, account: Account, at: datetime) -> float:
+    """
+    returns the account balance just after `at`: the current balance minus
+    everything after `at`, read as the latest running total minus the one
+    before `at`'s month and the part of that month up to `at`. That is two
+    checkpoint lookups and one month of transactions, whatever the history
+    length
+    """
+    period_start = checkpoint_period(at)
+    in_period = (
+        select(func.coalesce(func.sum(Transaction.transaction_amount), 0))
+        .where(
+            Transaction.account_id == account.id,
+            Transaction.transaction_date >= period_start,
+            Transaction.transaction_date <= at,
+        )
+        .scalar_subquery()
+    )
+    latest, before_period, until_at = db.execute(
+        select(
+            latest_cumulative(account.id),
+            latest_cumulative(account.id, period_start),
+            in_period,
+        )
+    ).one()
+
+    return round(account.current_balance - latest + before_period + until_at, 2)
+
+
+def get_balance_history(
+    db: Session,
+    account: Account,
+    date_from: datetime,
+    date_to: datetime,
+    step: str,
+) -> list[dict]:
+    """
+    returns the account balance at `date_from` and every `step` after it
+    before `date_to`, from a running SUM() OVER the transactions in between
+    """
+    points = balance_points(date_from, date_to, step)
+    opening = get_balance_at(db, account, date_from)
+
+    running = func.sum(Transaction.transaction_amount).over(
+        order_by=(Transaction.transaction_date, Transaction.id)
+    )
+    rows = (
+        db.query(Transaction.transaction_date, running)
+        .filter(
+            Transaction.account_id == account.id,
+            Transaction.transaction_date > date_from,
+            Transaction.transaction_date < date_to,
+        )
+        .order_by(Transaction.transaction_date, Transaction.id)
+        .all()
+    )
+
+    history = []
+    balance = opening
+    position = 0
+    for point in points:
+        while position < len(rows) and rows[position][0] <= point:
+            balance = round(opening + rows[position][1], 2)
+            position += 1
+        history.append({"date": point, "balance": balance})
+
+    return history
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Backfill or repair the balance_checkpoint table"
+    )
+    parser.add_argument("--account-id", help="only rebuild this account's checkpoints")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild_checkpoints(db, args.account_id)
+    finally:
+        db.close()
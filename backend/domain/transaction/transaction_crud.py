@@ -1,45 +1,124 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import extract
-from datetime import datetime
+from sqlalchemy import extract, func, or_, insert, select, tuple_, literal, DateTime
+from datetime import date, datetime, time, timedelta, timezone
 from dateutil.relativedelta import relativedelta
-from collections import defaultdict
 from domain.transaction.transaction_schema import (
     TransactionCreate,
     TransactionUpdate,
 )
-from domain.account.account_crud import (
-    account_balance_update,
-    get_account_by_id,
-    get_all_accounts_by_user_id,
+from domain.account.account_crud import account_balance_update
+from domain.analytics.analytics_cache import transaction_columns
+from domain.category.category_crud import (
+    DEFAULT_CATEGORIES,
+    category_is_expense,
+    get_category_id,
+    get_category_name,
+    get_non_expense_category_ids,
+)
+from domain.transaction.transaction_checkpoint import (
+    add_checkpoint_delta,
+    apply_checkpoint_deltas,
+)
+from domain.user.user_version import bump_data_version
+from domain.transaction.transaction_rollup import (
+    add_rollup_delta,
+    apply_rollup_deltas,
+    get_monthly_category_totals,
+)
+from models import (
+    Account,
+    Category,
+    Money,
+    MonthlyCategoryTotal,
+    Transaction,
+    User,
+    to_cents,
 )
-from models import Transaction, User
 from starlette import status
 from fastapi import HTTPException
+import base64
 import uuid
 
+EXPORT_BATCH_SIZE = 1000
+
 
 def create_transaction(
     db: Session, transaction_create: TransactionCreate, account_id: str
 ) -> Transaction:
     """
-    Create new transaction
+    Create new transaction. The balance update, insert and rollup upsert
+    run in one database transaction
     """
-    account = get_account_by_id(db, account_id)
+    # keep the returned object identical to what is stored
+    amount = to_cents(transaction_create.transaction_amount) / 100
+    category_id = get_category_id(db, transaction_create.transaction_category)
+
+    account = account_balance_update(db, account_id, amount)
+    if account is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found",
+        )
+
     db_transaction = Transaction(
         id=str(uuid.uuid4()),
         transaction_date=transaction_create.transaction_date,
         transaction_description=transaction_create.transaction_description,
-        transaction_category=transaction_create.transaction_category,
-        transaction_amount=transaction_create.transaction_amount,
-        account_id=account.id,
-        account=account,
+        category_id=category_id,
+        transaction_amount=amount,
+        account_id=account_id,
     )
+    db.add(db_transaction)
 
-    account_balance_update(db, account, db_transaction.transaction_amount)
+    deltas = {}
+    add_rollup_delta(
+        deltas,
+        db_transaction.transaction_date,
+        db_transaction.category_id,
+        db_transaction.transaction_amount,
+    )
+    apply_rollup_deltas(db, account.user_id, deltas)
+
+    checkpoint_deltas = {}
+    add_checkpoint_delta(
+        checkpoint_deltas,
+        db_transaction.transaction_date,
+        db_transaction.transaction_amount,
+    )
+    apply_checkpoint_deltas(db, account_id, checkpoint_deltas)
+    version = bump_data_version(db, account.user_id)
 
-    db.add(db_transaction)
     db.commit()
-    return get_account_transaction_by_id(db, db_transaction.id)
+    transaction_columns.append(
+        account.user_id,
+        version,
+        [(db_transaction.transaction_date, to_cents(amount), category_id, account_id)],
+    )
+    return db_transaction
+
+
+def get_transaction_for_update(
+    db: Session, account_id: str, transaction_id: str
+) -> Transaction:
+    """
+    Loads (and on PostgreSQL row-locks) an account's transaction, 404 on mismatch
+    """
+    transaction = (
+        db.query(Transaction)
+        .filter(
+            Transaction.id == transaction_id,
+            Transaction.account_id == account_id,
+        )
+        .with_for_update()
+        .first()
+    )
+    if transaction is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction and account mismatch",
+        )
+    return transaction
 
 
 def update_transaction(
@@ -51,27 +130,45 @@ def update_transaction(
     """
     update Transaction
     """
-    account = get_account_by_id(db, account_id)
-    transaction = get_account_transaction_by_id(db, transaction_id)
-
-    if not valid_transaction(db, account_id, transaction_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction and account mismatch",
-        )
+    transaction = get_transaction_for_update(db, account_id, transaction_id)
 
     old_amount = transaction.transaction_amount
+    new_amount = to_cents(transaction_update.transaction_amount) / 100
+    category_id = get_category_id(db, transaction_update.transaction_category)
+
+    account = account_balance_update(db, account_id, new_amount - old_amount)
+
+    deltas = {}
+    add_rollup_delta(
+        deltas,
+        transaction.transaction_date,
+        transaction.category_id,
+        old_amount,
+        -1,
+    )
+    add_rollup_delta(
+        deltas,
+        transaction_update.transaction_date,
+        category_id,
+        new_amount,
+    )
+    apply_rollup_deltas(db, account.user_id, deltas)
+
+    checkpoint_deltas = {}
+    add_checkpoint_delta(
+        checkpoint_deltas, transaction.transaction_date, old_amount, -1
+    )
+    add_checkpoint_delta(
+        checkpoint_deltas, transaction_update.transaction_date, new_amount
+    )
+    apply_checkpoint_deltas(db, account_id, checkpoint_deltas)
 
-    # remove the old amount from the current balance by negating the sign
-    account_balance_update(db, account, (old_amount * -1))
     transaction.transaction_date = transaction_update.transaction_date
     transaction.transaction_description = transaction_update.transaction_description
-    transaction.transaction_category = transaction_update.transaction_category
-    transaction.transaction_amount = transaction_update.transaction_amount
+    transaction.category_id = category_id
+    transaction.transaction_amount = new_amount
+    bump_data_version(db, account.user_id)
 
-    account_balance_update(db, account, transaction_update.transaction_amount)
-
-    db.add(transaction)
     db.commit()
     return get_account_transactions_all(db, account_id)
 
@@ -81,33 +178,104 @@ def remove_transaction(
     transaction_id: str,
     account_id: str,
 ):
+    transaction = get_transaction_for_update(db, account_id, transaction_id)
 
-    if not valid_transaction(db, account_id, transaction_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction and account mismatch",
-        )
+    old_amount = transaction.transaction_amount
 
-    account = get_account_by_id(db, account_id)
-    transaction = get_account_transaction_by_id(db, transaction_id)
+    # remove the old amount from the current balance by negating the sign
+    account = account_balance_update(db, account_id, old_amount * -1)
+
+    deltas = {}
+    add_rollup_delta(
+        deltas,
+        transaction.transaction_date,
+        transaction.category_id,
+        old_amount,
+        -1,
+    )
+    apply_rollup_deltas(db, account.user_id, deltas)
 
-    old_amount = transaction.transaction_amount
-    account_balance_update(db, account, (old_amount * -1))
+    checkpoint_deltas = {}
+    add_checkpoint_delta(
+        checkpoint_deltas, transaction.transaction_date, old_amount, -1
+    )
+    apply_checkpoint_deltas(db, account_id, checkpoint_deltas)
+    bump_data_version(db, account.user_id)
 
     db.delete(transaction)
     db.commit()
 
 
+def insert_transaction_batch(
+    db: Session,
+    account: Account,
+    batch: list[TransactionCreate],
+) -> float:
+    """
+    Inserts a batch of transactions with one multi-row INSERT, updates the
+    rollup and balance checkpoints and returns the batch's net amount. Does not commit
+    """
+    category_ids = {
+        name: get_category_id(db, name)
+        for name in {item.transaction_category for item in batch}
+    }
+    # rounded to cents like each stored row, so the balance, rollup and
+    # checkpoints move by exactly what the transactions add up to
+    amounts = [to_cents(item.transaction_amount) / 100 for item in batch]
+
+    deltas = {}
+    checkpoint_deltas = {}
+    for item, amount in zip(batch, amounts):
+        add_rollup_delta(
+            deltas,
+            item.transaction_date,
+            category_ids[item.transaction_category],
+            amount,
+        )
+        add_checkpoint_delta(checkpoint_deltas, item.transaction_date, amount)
+    apply_rollup_deltas(db, account.user_id, deltas)
+    apply_checkpoint_deltas(db, account.id, checkpoint_deltas)
+
+    db.execute(
+        insert(Transaction),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "transaction_date": item.transaction_date,
+                "transaction_description": item.transaction_description,
+                "category_id": category_ids[item.transaction_category],
+                "transaction_amount": amount,
+                "account_id": account.id,
+            }
+            for item, amount in zip(batch, amounts)
+        ],
+    )
+    return sum(to_cents(amount) for amount in amounts) / 100
+
+
+def finish_bulk_import(db: Session, account_id: str, net_amount: float) -> None:
+    """
+    Applies a bulk import's net amount to the account balance and commits
+    the whole import
+    """
+    account = account_balance_update(db, account_id, net_amount)
+    bump_data_version(db, account.user_id)
+    db.commit()
+
+
 def get_account_transactions_all(
     db: Session,
     account_id: str,
 ):
     """
-    Retrieves all transaction of an account
+    Retrieves all transaction of an account, oldest first
     """
 
     transactions = (
-        db.query(Transaction).filter(Transaction.account_id == account_id).all()
+        db.query(Transaction)
+        .filter(Transaction.account_id == account_id)
+        .order_by(Transaction.transaction_date, Transaction.id)
+        .all()
     )
     if not transactions:
         return
@@ -123,109 +291,221 @@ def get_account_transaction_by_id(
     return db.query(Transaction).filter(Transaction.id == transaction_id).first()
 
 
-def valid_transaction(db: Session, account_id: str, transaction_id: str) -> bool:
+def valid_transaction(
+    db: Session,
+    account_id: str,
+    transaction_id: str,
+    user_id: str | None = None,
+) -> bool:
     """
-    Checks if a transaction is valid and returns bool
+    Checks if a transaction belongs to the account (and to the user, when
+    given) with a single primary key existence query and returns bool
     """
+    query = db.query(Transaction.id).filter(
+        Transaction.id == transaction_id,
+        Transaction.account_id == account_id,
+    )
+    if user_id:
+        query = query.join(Account, Transaction.account_id == Account.id).filter(
+            Account.user_id == user_id
+        )
+
+    return db.query(query.exists()).scalar()
 
-    account_transactions = get_account_transactions_all(db, account_id)
 
-    transaction_id_set = set()
+def encode_transaction_cursor(transaction: Transaction) -> str:
+    """
+    returns an opaque cursor pointing just past the given transaction
+    """
+    raw = f"{transaction.transaction_date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-    for transaction in account_transactions:
-        transaction_id_set.add(transaction.id)
 
-    if transaction_id not in transaction_id_set:
-        return False
-    return True
+def decode_transaction_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    returns (transaction_date, id) from a cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date, transaction_id = raw.split("|", 1)
+        return datetime.fromisoformat(date), transaction_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
 
 
-def get_all_transactions(db: Session, user_id: str):
+def all_transactions_statement(
+    user_id: str, limit: int | None = None, after: str | None = None
+):
     """
-    returns all transactions for a user
+    the keyset-paginated query of get_all_transactions
     """
-    transactions = []
+    statement = (
+        select(Transaction)
+        .join(Account, Transaction.account_id == Account.id)
+        .where(Account.user_id == user_id)
+    )
 
-    accounts = get_all_accounts_by_user_id(db, user_id)
+    if after:
+        after_date, after_id = decode_transaction_cursor(after)
+        statement = statement.where(
+            tuple_(Transaction.transaction_date, Transaction.id)
+            < tuple_(literal(after_date, DateTime), literal(after_id))
+        )
 
-    for account in accounts:
-        account_transactions = get_account_transactions_all(db, account.id)
-        if account_transactions:
-            for item in account_transactions:
-                transactions.append(item)
+    statement = statement.order_by(
+        Transaction.transaction_date.desc(), Transaction.id.desc()
+    )
 
-    return transactions
+    if limit:
+        statement = statement.limit(limit)
 
+    return statement
 
-def get_account_transactions_by_month(
-    db: Session, account_id: str, year: int, month: int
+
+def get_all_transactions(
+    db: Session,
+    user_id: str,
+    limit: int | None = None,
+    after: str | None = None,
 ):
     """
-    return query for account's transactions by month/year
+    returns a user's transactions, newest first, in one query.
+    Pass limit and the previous page's cursor as after to page through them
     """
-    year, month = year, month
+    return db.scalars(all_transactions_statement(user_id, limit, after)).all()
 
-    transactions = (
-        db.query(Transaction)
-        .filter(
-            Transaction.account_id == account_id,
-            extract("year", Transaction.transaction_date) == year,
-            extract("month", Transaction.transaction_date) == month,
+
+async def get_all_transactions_async(
+    db: AsyncSession,
+    user_id: str,
+    limit: int | None = None,
+    after: str | None = None,
+):
+    """
+    get_all_transactions on an async session
+    """
+    return (await db.scalars(all_transactions_statement(user_id, limit, after))).all()
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    returns a timezone-aware datetime as naive UTC, like the stored
+    transaction dates. Naive datetimes are returned unchanged
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def transaction_date_range(
+    date_from: datetime | date | None, date_to: datetime | date | None
+) -> tuple[datetime | None, datetime | None]:
+    """
+    returns a from / to query range as naive datetimes for
+    from <= transaction_date < to. A date-only to covers that whole day, so
+    it becomes the start of the next day
+    """
+    if isinstance(date_from, datetime):
+        date_from = naive_utc(date_from)
+    elif date_from is not None:
+        date_from = datetime.combine(date_from, time.min)
+    if isinstance(date_to, datetime):
+        date_to = naive_utc(date_to)
+    elif date_to is not None:
+        date_to = datetime.combine(date_to + timedelta(days=1), time.min)
+    return date_from, date_to
+
+
+def stream_user_transactions(
+    db: Session,
+    user_id: str,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    account_id: str | None = None,
+):
+    """
+    Yields a user's transactions oldest first as plain rows, fetched from a
+    server-side cursor in batches so memory stays flat
+    """
+    statement = (
+        select(
+            Transaction.id,
+            Transaction.transaction_date,
+            Transaction.transaction_description,
+            func.coalesce(Category.name, "").label("transaction_category"),
+            Transaction.transaction_amount,
+            Transaction.account_id,
         )
-        .all()
+        .join(Account, Transaction.account_id == Account.id)
+        .outerjoin(Category, Transaction.category_id == Category.id)
+        .where(Account.user_id == user_id)
+        .order_by(Transaction.transaction_date, Transaction.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
     )
+    if date_from:
+        statement = statement.where(Transaction.transaction_date >= date_from)
+    if date_to:
+        statement = statement.where(Transaction.transaction_date < date_to)
+    if account_id:
+        statement = statement.where(Transaction.account_id == account_id)
 
-    return transactions
+    yield from db.execute(statement)
 
 
-def get_all_transactions_by_month(db: Session, user_id: str, year: int, month: int):
-    monthly_transactions = []
+def month_range(year: int, month: int) -> tuple[datetime, datetime]:
+    """
+    returns the half-open [start, end) datetime range of a month
+    """
+    start = datetime(year, month, 1)
+    return start, start + relativedelta(months=1)
 
-    accounts = get_all_accounts_by_user_id(db, user_id)
 
-    for account in accounts:
-        current_month = get_account_transactions_by_month(db, account.id, year, month)
-        if current_month:
-            for item in current_month:
-                monthly_transactions.append(item)
+def account_transactions_by_month_query(
+    db: Session, account_id: str, year: int, month: int
+):
+    """
+    return query for account's transactions by month/year
+    """
+    start, end = month_range(year, month)
 
-    return monthly_transactions
+    return db.query(Transaction).filter(
+        Transaction.account_id == account_id,
+        Transaction.transaction_date >= start,
+        Transaction.transaction_date < end,
+    )
 
 
-def sort_transactions_date(transactions: list):
+def get_account_transactions_by_month(
+    db: Session, account_id: str, year: int, month: int
+):
     """
-    sort transactions by date descending
+    return account's transactions by month/year
     """
+    return account_transactions_by_month_query(db, account_id, year, month).all()
+
 
-    return sorted(transactions, key=lambda x: x.transaction_date, reverse=True)
+def get_transaction_balances_by_category(
+    db: Session, user_id: str, year: int, month: int
+):
+    """
+    return transactions categories' balances for a month
+    """
+    return balances_by_category(get_monthly_category_totals(db, user_id, year, month))
 
 
-def get_transaction_balances_by_category(transactions):
+def balances_by_category(totals: dict[int, float]) -> dict[str, float]:
     """
-    return transactions categories' balances
+    returns the default categories' and the month's own categories' totals
+    from a month's {category_id: total}
     """
-    category_balances = {
-        "auto-transport": 0,
-        "bills-utilities": 0,
-        "credit": 0,
-        "education": 0,
-        "fees-charges": 0,
-        "food-restaurants": 0,
-        "gas": 0,
-        "groceries": 0,
-        "health-fitness": 0,
-        "income": 0,
-        "misc": 0,
-        "mortgage-rent": 0,
-        "personal care": 0,
-        "pets": 0,
-        "refund": 0,
-        "shopping": 0,
-        "transfer": 0,
-    }
+    category_balances = dict.fromkeys(DEFAULT_CATEGORIES, 0)
 
-    for item in transactions:
-        category_balances[item.transaction_category] += abs(item.transaction_amount)
+    for category_id, total in totals.items():
+        if category_id:
+            category_balances[get_category_name(category_id)] = total
 
     return category_balances
 
@@ -234,75 +514,82 @@ def get_expenses_total_for_month(db: Session, user_id: str, year: int, month: in
     """
     return expenses by month (no income, credit, transfer)
     """
-    current_total = 0.0
-    income = {"credit", "income", "transfer"}
-
-    transactions = get_all_transactions_by_month(db, user_id, year, month)
-    for item in transactions:
-        if item.transaction_category not in income:
-            current_total += abs(item.transaction_amount)
-
-    return current_total
+    return (
+        db.query(func.coalesce(func.sum(MonthlyCategoryTotal.total), 0))
+        .filter(
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.year_month == f"{year:04d}-{month:02d}",
+            MonthlyCategoryTotal.category_id.notin_(get_non_expense_category_ids(db)),
+        )
+        .scalar()
+    )
 
 
-def get_six_months_total_expenses(
-    db: Session, user_id: str, year: int, month: int, day: int
+def get_monthly_total_expenses(
+    db: Session, user_id: str, year: int, month: int, months: int = 6
 ):
     """
-    return last six months expenses (total value)
+    return total expenses (no income, credit, transfer) for each of the last
+    `months` months ending with year/month, newest first, from one GROUP BY query
     """
-    income = {"credit", "income", "transfer"}
-    expenses_by_month = defaultdict(float)
-
-    current_date = datetime(year, month, day)
-
-    for i in range(6):
-        date = current_date - relativedelta(months=i)
-        current_year, current_month = date.year, date.month
-
-        total_expenses = 0.0
-        transactions = get_all_transactions_by_month(
-            db, user_id, current_year, current_month
+    current_month = datetime(year, month, 1)
+    start = current_month - relativedelta(months=months - 1)
+    _, end = month_range(year, month)
+
+    year_column = extract("year", Transaction.transaction_date)
+    month_column = extract("month", Transaction.transaction_date)
+    non_expense_ids = get_non_expense_category_ids(db)
+
+    rows = (
+        db.query(
+            year_column,
+            month_column,
+            func.sum(func.abs(Transaction.transaction_amount, type_=Money)),
         )
-        date_key = format_date(current_year, current_month)
-        for item in transactions:
-            if item.transaction_category not in income:
-                total_expenses += abs(item.transaction_amount)
-        expenses_by_month[f"{date_key}"] = total_expenses
+        .join(Account, Transaction.account_id == Account.id)
+        .filter(
+            Account.user_id == user_id,
+            Transaction.transaction_date >= start,
+            Transaction.transaction_date < end,
+            or_(
+                Transaction.category_id.is_(None),
+                Transaction.category_id.notin_(non_expense_ids),
+            ),
+        )
+        .group_by(year_column, month_column)
+        .all()
+    )
+    totals = {
+        (int(row_year), int(row_month)): total for row_year, row_month, total in rows
+    }
+
+    expenses_by_month = {}
+    for i in range(months):
+        date = current_month - relativedelta(months=i)
+        date_key = format_date(date.year, date.month)
+        expenses_by_month[date_key] = totals.get((date.year, date.month), 0.0)
 
     return expenses_by_month
 
 
-def get_monthly_expenses_by_category(transactions):
-    expense_balances = {
-        "auto-transport": 0,
-        "bills-utilities": 0,
-        "education": 0,
-        "fees-charges": 0,
-        "food-restaurants": 0,
-        "gas": 0,
-        "groceries": 0,
-        "health-fitness": 0,
-        "misc": 0,
-        "mortgage-rent": 0,
-        "personal care": 0,
-        "pets": 0,
-        "refund": 0,
-        "shopping": 0,
-    }
-
-    used_categories = {}
+def get_monthly_expenses_by_category(db: Session, user_id: str, year: int, month: int):
+    """
+    return a month's non-zero expense totals by category
+    """
+    return expenses_by_category(get_monthly_category_totals(db, user_id, year, month))
 
-    for item in transactions:
-        category = item.transaction_category
-        if item.transaction_category in expense_balances:
-            expense_balances[category] += abs(item.transaction_amount)
 
-    for key, value in expense_balances.items():
-        if expense_balances[key] != 0:
-            used_categories[key] = value
+def expenses_by_category(totals: dict[int, float]) -> dict[str, float]:
+    """
+    returns the non-zero expense categories of a month's {category_id: total}
+    """
+    used_categories = {
+        get_category_name(category_id): total
+        for category_id, total in totals.items()
+        if category_id and category_is_expense(category_id) and total != 0
+    }
 
-    return used_categories
+    return dict(sorted(used_categories.items()))
 
 
 def format_date(year, month):
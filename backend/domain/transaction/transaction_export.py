@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+EXPORT_COLUMNS = [
+    "id",
+    "transaction_date",
+    "transaction_description",
+    "transaction_category",
+    "transaction_amount",
+    "account_id",
+]
+
+# flush to the client once this many characters are buffered
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_csv(rows: Iterable) -> Iterator[str]:
+    """
+    Encodes transaction rows as CSV with a header row, in chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            [
+                row.id,
+                row.transaction_date.isoformat(),
+                row.transaction_description,
+                row.transaction_category,
+                row.transaction_amount,
+                row.account_id,
+            ]
+        )
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows: Iterable) -> Iterator[str]:
+    """
+    Encodes transaction rows as newline delimited JSON, in chunks
+    """
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(
+            {
+                "id": row.id,
+                "transaction_date": row.transaction_date.isoformat(),
+                "transaction_description": row.transaction_description,
+                "transaction_category": row.transaction_category,
+                "transaction_amount": row.transaction_amount,
+                "account_id": row.account_id,
+            }
+        )
+        lines.append(line)
+        size += len(line) + 1
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+            size = 0
+    if lines:
+        yield "\n".join(lines) + "\n"
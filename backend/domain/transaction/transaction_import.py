@@ -0,0 +1,133 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from models import Account
+from starlette.concurrency import run_in_threadpool
+from domain.transaction.transaction_crud import (
+    insert_transaction_batch,
+    finish_bulk_import,
+)
+from domain.transaction.transaction_schema import (
+    TransactionCreate,
+    TransactionBulkError,
+    TransactionBulkResponse,
+)
+
+BULK_BATCH_SIZE = 1000
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+}
+
+
+def bulk_format(content_type: str) -> str | None:
+    """
+    returns "csv" or "ndjson" for a request content type, None if unsupported
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return "csv"
+    if media_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Splits a streamed utf-8 body into lines without buffering the whole body
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        pending = ""
+        if lines and not lines[-1].endswith(("\n", "\r")):
+            pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r\n")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def parse_row(fmt: str, line: str, header: list[str] | None) -> TransactionCreate:
+    """
+    Parses one CSV/NDJSON line into a TransactionCreate
+    """
+    if fmt == "csv":
+        values = next(csv.reader([line]))
+        if len(values) != len(header):
+            raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+        fields = dict(zip(header, values))
+    else:
+        fields = json.loads(line)
+        if not isinstance(fields, dict):
+            raise ValueError("expected a JSON object")
+    return TransactionCreate(**fields)
+
+
+async def import_transactions(
+    db: Session,
+    account: Account,
+    fmt: str,
+    chunks: AsyncIterator[bytes],
+) -> TransactionBulkResponse:
+    """
+    Streams rows from the request body into batched INSERTs, all inside one
+    database transaction. Invalid rows are reported and skipped.
+    """
+    errors = []
+    batch = []
+    header = None
+    inserted = 0
+    net_amount = 0.0
+    line_number = 0
+
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [column.strip() for column in next(csv.reader([line]))]
+            continue
+        try:
+            batch.append(parse_row(fmt, line, header))
+        except ValidationError as e:
+            errors.append(
+                TransactionBulkError(
+                    line=line_number, detail=format_validation_error(e)
+                )
+            )
+        except (ValueError, TypeError) as e:
+            errors.append(TransactionBulkError(line=line_number, detail=str(e)))
+
+        if len(batch) >= BULK_BATCH_SIZE:
+            net_amount += await run_in_threadpool(
+                insert_transaction_batch, db, account, batch
+            )
+            inserted += len(batch)
+            batch = []
+
+    if batch:
+        net_amount += await run_in_threadpool(
+            insert_transaction_batch, db, account, batch
+        )
+        inserted += len(batch)
+
+    await run_in_threadpool(finish_bulk_import, db, account.id, net_amount)
+
+    return TransactionBulkResponse(inserted=inserted, errors=errors)
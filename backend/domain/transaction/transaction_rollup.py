@@ -0,0 +1,215 @@
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import extract, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models import Account, Money, MonthlyCategoryTotal, Transaction
+
+# rollup category_id of transactions without a category
+UNCATEGORIZED_ID = 0
+
+
+def rollup_key(transaction_date: datetime, category_id: int | None) -> tuple[str, int]:
+    """
+    returns the (year_month, category_id) rollup key of a transaction
+    """
+    return (
+        f"{transaction_date.year:04d}-{transaction_date.month:02d}",
+        category_id or UNCATEGORIZED_ID,
+    )
+
+
+def add_rollup_delta(
+    deltas: dict,
+    transaction_date: datetime,
+    category_id: int | None,
+    amount: float,
+    count: int = 1,
+) -> None:
+    """
+    Accumulates a transaction into a deltas dict. Use count=-1 to take it out
+    """
+    merge_rollup_delta(
+        deltas, rollup_key(transaction_date, category_id), count * abs(amount), count
+    )
+
+
+def merge_rollup_delta(deltas: dict, key: tuple[str, int], total: float, count: int):
+    deltas_total, deltas_count = deltas.get(key, (0.0, 0))
+    deltas[key] = (deltas_total + total, deltas_count + count)
+
+
+def dialect_insert(db: Session):
+    """
+    returns the insert construct supporting on_conflict_do_update for the
+    session's database
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert
+    return sqlite_insert
+
+
+def apply_rollup_deltas(db: Session, user_id: str, deltas: dict) -> None:
+    """
+    Upserts accumulated deltas into the user's monthly category totals.
+    Does not commit, so it shares the caller's database transaction
+    """
+    if not user_id or not deltas:
+        return
+
+    statement = dialect_insert(db)(MonthlyCategoryTotal).values(
+        [
+            {
+                "user_id": user_id,
+                "year_month": year_month,
+                "category_id": category_id,
+                "total": total,
+                "count": count,
+            }
+            for (year_month, category_id), (total, count) in deltas.items()
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "year_month", "category_id"],
+        set_={
+            "total": MonthlyCategoryTotal.total + statement.excluded.total,
+            "count": MonthlyCategoryTotal.count + statement.excluded.count,
+        },
+    )
+    db.execute(statement)
+
+    if any(count < 0 for _, count in deltas.values()):
+        db.query(MonthlyCategoryTotal).filter(
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.count <= 0,
+        ).delete(synchronize_session=False)
+
+
+def remove_account_from_rollup(db: Session, account: Account) -> None:
+    """
+    Takes all of an account's transactions out of its user's rollup
+    """
+    deltas = {}
+    for _, key, total, count in grouped_transaction_totals(
+        db, Transaction.account_id == account.id
+    ):
+        merge_rollup_delta(deltas, key, -total, -count)
+
+    apply_rollup_deltas(db, account.user_id, deltas)
+
+
+def grouped_transaction_totals(db: Session, *criteria):
+    """
+    returns (user_id, rollup key, total, count) rows of the transactions
+    matching criteria
+    """
+    year_column = extract("year", Transaction.transaction_date)
+    month_column = extract("month", Transaction.transaction_date)
+
+    rows = (
+        db.query(
+            Account.user_id,
+            year_column,
+            month_column,
+            Transaction.category_id,
+            func.sum(func.abs(Transaction.transaction_amount, type_=Money)),
+            func.count(Transaction.id),
+        )
+        .join(Account, Transaction.account_id == Account.id)
+        .filter(*criteria)
+        .group_by(Account.user_id, year_column, month_column, Transaction.category_id)
+        .all()
+    )
+
+    return [
+        (
+            user_id,
+            rollup_key(datetime(int(year), int(month), 1), category_id),
+            total,
+            count,
+        )
+        for user_id, year, month, category_id, total, count in rows
+    ]
+
+
+def get_monthly_category_totals(
+    db: Session, user_id: str, year: int, month: int
+) -> dict[int, float]:
+    """
+    returns {category_id: total} for a user's month
+    """
+    rows = (
+        db.query(MonthlyCategoryTotal.category_id, MonthlyCategoryTotal.total)
+        .filter(
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.year_month == f"{year:04d}-{month:02d}",
+        )
+        .all()
+    )
+    return {category_id: total for category_id, total in rows}
+
+
+def get_category_totals_by_month(
+    db: Session, user_id: str, first_month: datetime, last_month: datetime
+) -> dict[str, dict[int, float]]:
+    """
+    returns {year_month: {category_id: total}} for a user's months from
+    first_month through last_month, in one query
+    """
+    rows = (
+        db.query(
+            MonthlyCategoryTotal.year_month,
+            MonthlyCategoryTotal.category_id,
+            MonthlyCategoryTotal.total,
+        )
+        .filter(
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.year_month >= rollup_key(first_month, None)[0],
+            MonthlyCategoryTotal.year_month <= rollup_key(last_month, None)[0],
+        )
+        .all()
+    )
+    totals = defaultdict(dict)
+    for year_month, category_id, total in rows:
+        totals[year_month][category_id] = total
+    return dict(totals)
+
+
+def rebuild_rollup(db: Session, user_id: str | None = None) -> None:
+    """
+    Recomputes monthly category totals from the transaction table, for one
+    user or everyone, and commits
+    """
+    stale = db.query(MonthlyCategoryTotal)
+    criteria = [Account.user_id.is_not(None)]
+    if user_id:
+        stale = stale.filter(MonthlyCategoryTotal.user_id == user_id)
+        criteria.append(Account.user_id == user_id)
+    stale.delete(synchronize_session=False)
+
+    deltas_by_user = defaultdict(dict)
+    for row_user_id, key, total, count in grouped_transaction_totals(db, *criteria):
+        merge_rollup_delta(deltas_by_user[row_user_id], key, total, count)
+
+    for row_user_id, deltas in deltas_by_user.items():
+        apply_rollup_deltas(db, row_user_id, deltas)
+
+    db.commit()
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Backfill or repair the monthly_category_totals rollup"
+    )
+    parser.add_argument("--user-id", help="only rebuild this user's rollup")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild_rollup(db, args.user_id)
+    finally:
+        db.close()
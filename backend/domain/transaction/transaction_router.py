@@ -1,7 +1,9 @@
-from fastapi import APIRouter
-from fastapi import Depends
+from fastapi import APIRouter, HTTPException, Request
+from fastapi import Depends, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from starlette import status
+from datetime import date, datetime
 from database import get_db
 from domain.transaction.transaction_crud import (
     create_transaction,
@@ -10,12 +12,23 @@ from domain.transaction.transaction_crud import (
     get_account_transactions_all,
     get_account_transaction_by_id,
     valid_transaction,
+    transaction_date_range,
 )
 from domain.transaction.transaction_schema import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
+    TransactionBulkResponse,
 )
+from domain.transaction.transaction_import import (
+    bulk_format,
+    import_transactions,
+)
+from domain.transaction.transaction_search import search_transactions
+from domain.account.account_crud import get_account_by_id
+from domain.user.user_crud import validate_user
+from domain.user.user_router import get_current_user
+from models import User
 
 router = APIRouter(prefix="/peppermint")
 
@@ -25,7 +38,7 @@ def transaction_create(
     account_id: str,
     transaction_create: TransactionCreate,
     db: Session = Depends(get_db),
-):
+) -> TransactionResponse:
     """
     Create transaction router
     """
@@ -44,17 +57,70 @@ def transaction_create(
     )
 
 
+@router.post("/{account_id}/bulk")
+async def transaction_bulk_create(
+    account_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+) -> TransactionBulkResponse:
+    """
+    Bulk import transactions from a streamed CSV (with header row) or NDJSON body
+    """
+    fmt = bulk_format(request.headers.get("content-type", ""))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use text/csv or application/x-ndjson",
+        )
+
+    account = await run_in_threadpool(get_account_by_id, db, account_id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found",
+        )
+
+    return await import_transactions(db, account, fmt, request.stream())
+
+
+# declared before /{account_id}/{transaction_id}, which would match it too
+@router.get("/transactions/search")
+def transaction_search(
+    q: str = Query(min_length=1, max_length=200),
+    account_id: str | None = None,
+    date_from: datetime | date | None = Query(default=None, alias="from"),
+    date_to: datetime | date | None = Query(default=None, alias="to"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> list[TransactionResponse]:
+    """
+    Searches user's transaction descriptions for every word of q, optionally
+    within one account and a date range [from, to); a date-only `to`
+    includes that day. Best matches first, paged with limit and offset
+    """
+    validate_user(db, current_user)
+    date_from, date_to = transaction_date_range(date_from, date_to)
+    return search_transactions(
+        db, current_user.id, q, account_id, date_from, date_to, limit, offset
+    )
+
+
 @router.get("/{account_id}/{transaction_id}")
 def one_transaction_get(
     transaction_id: str,
     account_id: str,
     db: Session = Depends(get_db),
-):
+) -> TransactionResponse:
     """
     Get one transaction router
     """
-    # should this raise error if False?
-    valid_transaction(db, account_id, transaction_id)
+    if not valid_transaction(db, account_id, transaction_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction and account mismatch",
+        )
     return get_account_transaction_by_id(db, transaction_id)
 
 
@@ -64,11 +130,10 @@ def transaction_update(
     transaction_id: str,
     account_id: str,
     db: Session = Depends(get_db),
-):
+) -> list[TransactionResponse] | None:
     """
     update transaction router
     """
-    valid_transaction(db, account_id, transaction_id)
     return update_transaction(db, transaction_update, transaction_id, account_id)
 
 
@@ -77,9 +142,8 @@ def transaction_remove(
     transaction_id: str,
     account_id: str,
     db: Session = Depends(get_db),
-):
+) -> None:
     """
     Delete transaction router
     """
-    valid_transaction(db, account_id, transaction_id)
     return remove_transaction(db, transaction_id, account_id)
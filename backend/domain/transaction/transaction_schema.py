@@ -1,5 +1,6 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, field_validator
 from datetime import datetime
+from domain.category.category_crud import is_known_category
 
 
 class TransactionCreate(BaseModel):
@@ -8,12 +9,20 @@ class TransactionCreate(BaseModel):
     transaction_category: str
     transaction_amount: float
 
-    @validator("transaction_date", "transaction_amount")
+    @field_validator("transaction_date", "transaction_amount")
+    @classmethod
     def not_empty(cls, v):
         if not v:
             raise ValueError("This is a required field.")
         return v
 
+    @field_validator("transaction_category")
+    @classmethod
+    def known_category(cls, v):
+        if v and not is_known_category(v):
+            raise ValueError("Unknown category")
+        return v
+
 
 class TransactionUpdate(BaseModel):
     transaction_date: datetime
@@ -21,17 +30,37 @@ class TransactionUpdate(BaseModel):
     transaction_category: str
     transaction_amount: float
 
-    @validator("transaction_date", "transaction_amount")
+    @field_validator("transaction_date", "transaction_amount")
+    @classmethod
     def not_empty(cls, v):
         if not v:
             raise ValueError("This is a required field.")
         return v
 
+    @field_validator("transaction_category")
+    @classmethod
+    def known_category(cls, v):
+        if v and not is_known_category(v):
+            raise ValueError("Unknown category")
+        return v
+
 
 class TransactionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     transaction_date: datetime
     transaction_description: str
     transaction_category: str
     transaction_amount: float
     account_id: str
+
+
+class TransactionBulkError(BaseModel):
+    line: int
+    detail: str
+
+
+class TransactionBulkResponse(BaseModel):
+    inserted: int
+    errors: list[TransactionBulkError]
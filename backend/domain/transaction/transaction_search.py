@@ -0,0 +1,111 @@
+import re
+from datetime import datetime
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.orm import Session
+from models import Account, Transaction
+
+# SQLite FTS5 table over transaction_description, kept in sync by triggers
+# created in migration 0009; PostgreSQL uses a GIN index on this expression
+SEARCH_TABLE = "transaction_search"
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+search_table = table(SEARCH_TABLE, column("rowid"), column("rank"))
+
+# the 'simple' config keeps accents, so PostgreSQL folds these letters to
+# their base letter with translate(), like FTS5's remove_diacritics does.
+# Must match the index expression in migration 0009
+ACCENTED = (
+    "àáâãäåçèéêëìíîïñòóôõöùúûüýÿāăąćĉċčďēĕėęěĝğġģĥĩīĭįĵķĺļľńņňōŏőŕŗřśŝşšţťũūŭůűųŵŷźżž"
+)
+UNACCENTED = (
+    "aaaaaaceeeeiiiinooooouuuuyyaaaccccdeeeeegggghiiiijklllnnnooorrrssssttuuuuuuwyzzz"
+)
+UNACCENT = str.maketrans(ACCENTED, UNACCENTED)
+
+
+def search_terms(q: str) -> list[str]:
+    """
+    returns the words of a search string. Only word characters are kept, so
+    FTS5 / tsquery operators in user input are never interpreted. Accents
+    are folded as in the search document
+    """
+    return re.findall(r"\w+", q.lower().translate(UNACCENT))
+
+
+def search_transactions(
+    db: Session,
+    user_id: str,
+    q: str,
+    account_id: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[Transaction]:
+    """
+    returns a user's transactions whose description has every word of q
+    (as a prefix) and date_from <= transaction_date < date_to, best match
+    first, then newest first
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    query = (
+        db.query(Transaction)
+        .join(Account, Transaction.account_id == Account.id)
+        .filter(Account.user_id == user_id)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.to_tsquery(
+            SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms)
+        )
+        description = func.lower(func.coalesce(Transaction.transaction_description, ""))
+        document = func.to_tsvector(
+            SEARCH_CONFIG, func.translate(description, ACCENTED, UNACCENTED)
+        )
+        query = query.filter(document.op("@@")(tsquery))
+        rank = func.ts_rank(document, tsquery).desc()
+    else:
+        match = " ".join(f'"{term}"*' for term in terms)
+        query = query.join(
+            search_table,
+            search_table.c.rowid == literal_column('"transaction".rowid'),
+        ).filter(literal_column(SEARCH_TABLE).op("MATCH")(match))
+        # bm25, lower is better
+        rank = search_table.c.rank
+
+    if account_id:
+        query = query.filter(Transaction.account_id == account_id)
+    if date_from:
+        query = query.filter(Transaction.transaction_date >= date_from)
+    if date_to:
+        query = query.filter(Transaction.transaction_date < date_to)
+
+    return (
+        query.order_by(rank, Transaction.transaction_date.desc(), Transaction.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+
+
+def rebuild_search_index(db: Session) -> None:
+    """
+    Rebuilds the SQLite search table from the transaction table and commits.
+    Needed after a VACUUM, which may renumber the transaction rowids it is
+    keyed by. PostgreSQL's index needs no upkeep
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return
+    db.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+    db.commit()
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_search_index(db)
+    finally:
+        db.close()
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from starlette.config import Config
+from models import User
+
+config = Config(".env")
+
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", cast=int, default=1024)
+# seconds; also bounds how long other worker processes can serve a stale user
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", cast=float, default=60)
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of authenticated users keyed by token subject (username).
+    Entries expire after `ttl` seconds; a size or ttl of 0 disables caching
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> User | None:
+        """
+        returns a fresh detached copy of the cached user, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[subject]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            values = entry[1]
+
+        # a new instance per request, so no two sessions ever share one
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, subject: str, user: User) -> None:
+        if not self.maxsize or self.ttl <= 0:
+            return
+        values = {
+            attribute.key: getattr(user, attribute.key)
+            for attribute in inspect(User).column_attrs
+        }
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: str) -> None:
+        with self._lock:
+            for subject in subjects:
+                self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+
+def get_principal_cache_stats() -> dict:
+    """
+    returns the principal cache's hit/miss counters and size
+    """
+    return principal_cache.stats()
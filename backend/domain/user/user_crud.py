@@ -1,16 +1,19 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from domain.user.user_schema import (
     UserCreate,
     UserUpdate,
 )
-from models import User
-from passlib.context import CryptContext
+from domain.user.user_cache import principal_cache
+from models import User, MonthlyCategoryTotal
 import uuid
 from datetime import datetime, timedelta, timezone
 from starlette import status
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 from starlette.config import Config
-from database import get_db
+from database import get_async_db, get_db
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends
 from jose import jwt, JWTError
@@ -25,19 +28,17 @@ ACCEPTED_EMAILS = [
     config("EMAIL2", default="default2"),
 ]
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # CRUD
 
 
-def create_user(db: Session, user_create: UserCreate) -> User:
+def create_user(db: Session, user_create: UserCreate, password_hash: str) -> User:
     """
-    Creates a new user
+    Creates a new user, password_hash comes from user_password.hash_password
     """
     db_user = User(
         id=str(uuid.uuid4()),
         username=user_create.username,
-        password=pwd_context.hash(user_create.password1),
+        password=password_hash,
         email=user_create.email,
         first_name=user_create.first_name,
         last_name=user_create.last_name,
@@ -68,6 +69,13 @@ def get_user_by_username(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
 
 
+async def get_user_by_username_async(db: AsyncSession, username: str) -> User | None:
+    """
+    Retrives user by username on an async session.
+    """
+    return await db.scalar(select(User).where(User.username == username).limit(1))
+
+
 def get_user_by_id(db: Session, id: str) -> User | None:
     """
     Retrieves a user by the given ID
@@ -92,96 +100,140 @@ def update_user(
     db: Session,
     user_update: UserUpdate,
     current_user: User,
+    password_hash: str,
 ) -> User:
     """
-    Updates user
+    Updates user, password_hash comes from user_password.hash_password
     """
     user = get_user_by_id(db, current_user.id)
+    old_username = user.username
     user.username = user_update.username
-    user.password = pwd_context.hash(user_update.password1)
+    user.password = password_hash
     user.email = user_update.email
     user.first_name = user_update.first_name
     user.last_name = user_update.last_name
     user.modified = datetime.now(timezone.utc)
     db.add(user)
     db.commit()
+    # username, password or profile changed, drop the cached principal
+    principal_cache.invalidate(old_username, user.username)
     return get_user_by_id(db, user.id)
 
 
+def update_password_hash(db: Session, user: User, password_hash: str) -> None:
+    """
+    Replaces a user's password hash, e.g. after a bcrypt cost change
+    """
+    user = get_user_by_id(db, user.id)
+    user.password = password_hash
+    db.commit()
+    principal_cache.invalidate(user.username)
+
+
 def remove_user(db: Session, current_user: User) -> None:
     """
     Remmoves the currently logged in user.
     """
+    db.query(MonthlyCategoryTotal).filter(
+        MonthlyCategoryTotal.user_id == current_user.id
+    ).delete(synchronize_session=False)
     db.delete(current_user)
     db.commit()
+    principal_cache.invalidate(current_user.username)
 
 
 # Utils
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """
-    Authenticates the current user.
-    """
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def token_subject(token: str) -> str:
+    """
+    returns the username a bearer token was issued to
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    else:
-        user = get_user_by_username(db, username=username)
+        raise credentials_exception()
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception()
+    return username
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Authenticates the current user for routes on the sync session. The user
+    row is served from the principal cache when possible, otherwise loaded
+    on a worker thread with the request's own session.
+    """
+    username = token_subject(token)
+    user = principal_cache.get(username)
+    if user is None:
+        user = await run_in_threadpool(get_user_by_username, db, username)
         if user is None:
-            raise credentials_exception
-        return user
+            raise credentials_exception()
+        principal_cache.put(username, user)
+    return user
 
 
-def update_login_attempts(
-    db: Session,
-    current_user: User,
-    login_attempts: int = 0,
-    last_login_attempt: datetime = None,
-) -> None:
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
     """
-    Updates login attempts
+    Authenticates the current user for routes on the async session, with
+    the same principal cache as get_current_user
     """
-    user = get_user_by_username(db, current_user.username)
-    user.login_attempts += login_attempts
-    if last_login_attempt:
-        user.last_login_attempt = last_login_attempt
-    db.add(user)
+    username = token_subject(token)
+    user = principal_cache.get(username)
+    if user is None:
+        user = await get_user_by_username_async(db, username)
+        if user is None:
+            raise credentials_exception()
+        principal_cache.put(username, user)
+    return user
+
+
+def lock_user(db: Session, user: User, failures: int, seconds: int) -> None:
+    """
+    Persists a login lockout once the failed attempts cross the threshold,
+    so it survives restarts and applies to every worker
+    """
+    user = get_user_by_id(db, user.id)
+    user.login_attempts = failures
+    user.last_login_attempt = datetime.utcnow() + timedelta(seconds=seconds)
+    db.commit()
+
+
+def clear_lockout(db: Session, user: User) -> None:
+    """
+    Clears a persisted lockout after a successful login, only writes if set
+    """
+    if not user.login_attempts:
+        return
+    user = get_user_by_id(db, user.id)
+    user.login_attempts = 0
+    user.last_login_attempt = datetime.utcnow()
     db.commit()
 
 
-def check_login_attempts(db: Session, current_user: User):
+def lockout_remaining(user: User) -> float:
     """
-    After 3 unsuccessful login attempts, blocks the user for 10 minutes.
+    returns the seconds left on a user's persisted lockout, 0 if none
     """
-    if current_user.login_attempts == 3:
-        if datetime.utcnow() < current_user.last_login_attempt:
-            remainder = (
-                current_user.last_login_attempt - datetime.utcnow()
-            ).total_seconds()
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Too many failed login attempts. \
-                Please try again in {remainder} seconds.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        else:
-            update_login_attempts(db, current_user, -(current_user.login_attempts))
-    if current_user.login_attempts == 2:
-        new_time = current_user.last_login_attempt + timedelta(minutes=10)
-        update_login_attempts(db, current_user, 0, new_time)
+    if not user.login_attempts or not user.last_login_attempt:
+        return 0.0
+    return max(0.0, (user.last_login_attempt - datetime.utcnow()).total_seconds())
 
 
 def validate_user(db: Session, current_user: User) -> None:
@@ -189,8 +241,8 @@ def validate_user(db: Session, current_user: User) -> None:
     Validates user.
     """
     pass
-    '''
+    """
     all_users = db.query(User).all()
     if len(all_users) > 2 or current_user.email not in ACCEPTED_EMAILS:
         raise HTTPException(status_code=403, detail="You are not authorized.")
-    '''
\ No newline at end of file
+    """
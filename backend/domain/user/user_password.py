@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+from starlette.config import Config
+
+config = Config(".env")
+
+# bcrypt cost factor; stored hashes with a different cost are rehashed on login
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", cast=int, default=12)
+# processes hashing/verifying passwords at once, 0 hashes on the worker threads
+PASSWORD_HASH_WORKERS = config(
+    "PASSWORD_HASH_WORKERS", cast=int, default=min(4, os.cpu_count() or 1)
+)
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_password_pool() -> ProcessPoolExecutor:
+    """
+    Starts the password hashing processes on first use. They are spawned,
+    not forked, so they never inherit locks held by the server's threads
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_password_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+async def _run(function, *args):
+    if PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(function, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_pool(), function, *args)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hashes a password off the event loop and the request threads
+    """
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """
+    Verifies a password off the event loop and the request threads. Returns
+    (verified, new_hash), new_hash being set when the stored hash should be
+    replaced because its cost differs from PASSWORD_HASH_ROUNDS
+    """
+    return await _run(_verify_and_update, password, password_hash)
@@ -1,23 +1,27 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi import Depends
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta, datetime
 from database import get_db
 from domain.user.user_crud import (
-    pwd_context,
     create_user,
     update_user,
+    update_password_hash,
     get_user_by_username,
     get_user_by_id,
     get_existing_user,
-    check_login_attempts,
-    update_login_attempts,
+    lock_user,
+    clear_lockout,
+    lockout_remaining,
     remove_user,
     get_all_users,
     validate_user,
     get_current_user,
 )
+from domain.user.user_password import hash_password, verify_password
+from domain.user.user_throttle import client_ip, login_throttle
 from domain.user.user_schema import (
     UserCreate,
     UserResponse,
@@ -25,6 +29,7 @@ from domain.user.user_schema import (
     UserUpdate,
 )
 from domain.account.account_crud import get_user_accounts, get_all_accounts_by_user_id
+from domain.account.account_schema import AccountResponse
 from models import User
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from jose import jwt
@@ -40,20 +45,21 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/peppermint/user/login")
 
 
 @router.post("/register")
-def register(
+async def register(
     user_create: UserCreate,
     db: Session = Depends(get_db),
 ) -> UserResponse:
     """
     User registration.
     """
-    user = get_existing_user(db, user_create=user_create)
+    user = await run_in_threadpool(get_existing_user, db, user_create)
     if user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="This user already exists.",
         )
-    new_user = create_user(db=db, user_create=user_create)
+    password_hash = await hash_password(user_create.password1)
+    new_user = await run_in_threadpool(create_user, db, user_create, password_hash)
 
     return UserResponse(
         id=new_user.id,
@@ -69,31 +75,60 @@ def register(
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ) -> Token:
     """
-    Login endpoint.
+    Login endpoint. Failed attempts are counted in memory per username and
+    client IP; a lockout is only written to the user row when it starts.
     """
-    user = get_user_by_username(db, form_data.username)
-    if not user or not pwd_context.verify(form_data.password, user.password):
-        if user:
-            check_login_attempts(db, user)
-            update_login_attempts(db, user, 1, user.last_login_attempt)
+    ip = client_ip(request)
+    user = await run_in_threadpool(get_user_by_username, db, form_data.username)
+
+    remaining = login_throttle.blocked_for(form_data.username, ip)
+    if user:
+        remaining = max(remaining, lockout_remaining(user))
+    if remaining:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Too many failed login attempts. "
+            f"Please try again in {int(remaining) + 1} seconds.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    verified, new_password_hash = False, None
+    if user:
+        verified, new_password_hash = await verify_password(
+            form_data.password, user.password
+        )
+    if not verified:
+        crossed = login_throttle.record_failure(form_data.username, ip)
+        if user and crossed:
+            await run_in_threadpool(
+                lock_user,
+                db,
+                user,
+                login_throttle.limits["user"],
+                login_throttle.window,
+            )
 
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    check_login_attempts(db, user)
+
+    login_throttle.reset(form_data.username)
+    await run_in_threadpool(clear_lockout, db, user)
+    if new_password_hash:
+        await run_in_threadpool(update_password_hash, db, user, new_password_hash)
     data = {
         "sub": user.username,
         "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     }
     access_token = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
-    update_login_attempts(db, user, -(user.login_attempts), datetime.utcnow())
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -132,7 +167,7 @@ def get_accounts(
     user_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> list[AccountResponse] | None:
     """
     Get all accounts associated with user_id
     """
@@ -145,7 +180,7 @@ def delete_user_id(
     user_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-):
+) -> None:
     """
     Deletes users by user id
     """
@@ -158,7 +193,7 @@ def delete_user_id(
 def get_user_all(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[UserResponse] | list:
+) -> list[UserResponse]:
     """
     Returns all users in the database
     """
@@ -169,7 +204,7 @@ def get_user_all(
 
 
 @router.put("/")
-def user_update(
+async def user_update(
     user_update: UserUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -178,11 +213,14 @@ def user_update(
     Update user router
     """
     validate_user(db, current_user)
-    return update_user(db, user_update, current_user)
+    password_hash = await hash_password(user_update.password1)
+    return await run_in_threadpool(
+        update_user, db, user_update, current_user, password_hash
+    )
 
 
 @router.put("/{user_id}")
-def user_update_by_user_id(
+async def user_update_by_user_id(
     user_update: UserUpdate,
     user_id: str,
     db: Session = Depends(get_db),
@@ -192,5 +230,6 @@ def user_update_by_user_id(
     Update user by User Id router
     """
     validate_user(db, current_user)
-    user = get_user_by_id(db, user_id)
-    return update_user(db, user_update, user)
+    user = await run_in_threadpool(get_user_by_id, db, user_id)
+    password_hash = await hash_password(user_update.password1)
+    return await run_in_threadpool(update_user, db, user_update, user, password_hash)
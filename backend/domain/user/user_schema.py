@@ -1,4 +1,4 @@
-from pydantic import BaseModel, validator, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, ValidationInfo, field_validator
 from datetime import datetime
 
 
@@ -10,15 +10,17 @@ class UserCreate(BaseModel):
     last_name: str
     email: EmailStr
 
-    @validator("username", "password1", "password2", "email")
+    @field_validator("username", "password1", "password2", "email")
+    @classmethod
     def not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError("This is a required field.")
         return v
 
-    @validator("password2")
-    def match_passwords(cls, v, values):
-        if "password1" in values and v != values["password1"]:
+    @field_validator("password2")
+    @classmethod
+    def match_passwords(cls, v, info: ValidationInfo):
+        if "password1" in info.data and v != info.data["password1"]:
             raise ValueError("Passwords must match.")
         return v
 
@@ -31,20 +33,24 @@ class UserUpdate(BaseModel):
     last_name: str
     email: EmailStr
 
-    @validator("username", "password1", "password2", "email")
+    @field_validator("username", "password1", "password2", "email")
+    @classmethod
     def not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError("This is a required field.")
         return v
 
-    @validator("password2")
-    def match_passwords(cls, v, values):
-        if "password1" in values and v != values["password1"]:
+    @field_validator("password2")
+    @classmethod
+    def match_passwords(cls, v, info: ValidationInfo):
+        if "password1" in info.data and v != info.data["password1"]:
             raise ValueError("Passwords must match.")
         return v
 
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     username: str
     email: EmailStr
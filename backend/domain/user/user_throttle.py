@@ -0,0 +1,213 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from starlette.config import Config
+from starlette.requests import Request
+
+config = Config(".env")
+
+# failed logins allowed per username / client IP within LOGIN_WINDOW seconds
+LOGIN_MAX_ATTEMPTS = config("LOGIN_MAX_ATTEMPTS", cast=int, default=3)
+LOGIN_MAX_ATTEMPTS_PER_IP = config("LOGIN_MAX_ATTEMPTS_PER_IP", cast=int, default=20)
+LOGIN_WINDOW = config("LOGIN_WINDOW", cast=int, default=600)
+# "memory" (per process) or "sqlite" (shared by the workers on one host)
+LOGIN_THROTTLE_BACKEND = config("LOGIN_THROTTLE_BACKEND", default="memory")
+LOGIN_THROTTLE_SQLITE_PATH = config(
+    "LOGIN_THROTTLE_SQLITE_PATH", default="./login_throttle.db"
+)
+# header a reverse proxy puts the client address in, e.g. X-Forwarded-For.
+# Only set it behind a proxy that overwrites the header, clients can send it too
+LOGIN_CLIENT_IP_HEADER = config("LOGIN_CLIENT_IP_HEADER", default="")
+
+
+class ThrottleBackend(ABC):
+    """
+    Storage of failed login timestamps per key
+    """
+
+    @abstractmethod
+    def hit(self, key: str, now: float, window: float, limit: int) -> int:
+        """
+        records a failure and returns the failures of key within the window
+        (counting stops at limit)
+        """
+
+    @abstractmethod
+    def count(self, key: str, now: float, window: float) -> tuple[int, float]:
+        """
+        returns the failures of key within the window and the oldest one's time
+        """
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """
+        forgets all failures of key
+        """
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """
+    Sliding windows held in this process. Each key keeps at most `limit`
+    timestamps and idle keys are swept, so memory stays bounded
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._failures = {}
+        self._hits = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, failures: deque, now: float, window: float) -> None:
+        while failures and failures[0] <= now - window:
+            failures.popleft()
+
+    def hit(self, key: str, now: float, window: float, limit: int) -> int:
+        with self._lock:
+            self._hits += 1
+            if self._hits % self.SWEEP_EVERY == 0:
+                self._failures = {
+                    k: failures
+                    for k, failures in self._failures.items()
+                    if failures and failures[-1] > now - window
+                }
+
+            failures = self._failures.get(key)
+            if failures is None or failures.maxlen != limit:
+                failures = deque(failures or (), maxlen=limit)
+                self._failures[key] = failures
+            self._prune(failures, now, window)
+            failures.append(now)
+            return len(failures)
+
+    def count(self, key: str, now: float, window: float) -> tuple[int, float]:
+        with self._lock:
+            failures = self._failures.get(key)
+            if not failures:
+                return 0, now
+            self._prune(failures, now, window)
+            return len(failures), failures[0] if failures else now
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+class SQLiteThrottleBackend(ThrottleBackend):
+    """
+    Sliding windows in a local SQLite file, so every worker process on the
+    host sees the same failures. A stand-in for a shared cache server
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS login_failure (key TEXT, at REAL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_login_failure_key_at "
+                "ON login_failure (key, at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def hit(self, key: str, now: float, window: float, limit: int) -> int:
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM login_failure WHERE key = ? AND at <= ?",
+                (key, now - window),
+            )
+            connection.execute(
+                "INSERT INTO login_failure (key, at) VALUES (?, ?)", (key, now)
+            )
+            (failures,) = connection.execute(
+                "SELECT count(*) FROM login_failure WHERE key = ?", (key,)
+            ).fetchone()
+        return min(failures, limit)
+
+    def count(self, key: str, now: float, window: float) -> tuple[int, float]:
+        with self._connect() as connection:
+            failures, oldest = connection.execute(
+                "SELECT count(*), min(at) FROM login_failure "
+                "WHERE key = ? AND at > ?",
+                (key, now - window),
+            ).fetchone()
+        return failures, oldest if oldest is not None else now
+
+    def reset(self, key: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM login_failure WHERE key = ?", (key,))
+
+
+class LoginThrottle:
+    """
+    Counts failed logins per username and per client IP in sliding windows
+    """
+
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        max_attempts: int = LOGIN_MAX_ATTEMPTS,
+        max_attempts_per_ip: int = LOGIN_MAX_ATTEMPTS_PER_IP,
+        window: int = LOGIN_WINDOW,
+    ):
+        self.backend = backend
+        self.window = window
+        self.limits = {"user": max_attempts, "ip": max_attempts_per_ip}
+
+    def _keys(self, username: str, ip: str) -> dict[str, str]:
+        return {"user": f"user:{username}", "ip": f"ip:{ip}"}
+
+    def blocked_for(self, username: str, ip: str) -> float:
+        """
+        returns the seconds until username / ip may try again, 0 if not blocked
+        """
+        now = time.time()
+        remaining = 0.0
+        for kind, key in self._keys(username, ip).items():
+            failures, oldest = self.backend.count(key, now, self.window)
+            if failures >= self.limits[kind]:
+                remaining = max(remaining, oldest + self.window - now)
+        return remaining
+
+    def record_failure(self, username: str, ip: str) -> bool:
+        """
+        Records a failed login. Returns True when it makes the username
+        cross its threshold
+        """
+        now = time.time()
+        crossed = False
+        for kind, key in self._keys(username, ip).items():
+            failures = self.backend.hit(key, now, self.window, self.limits[kind])
+            if kind == "user" and failures == self.limits[kind]:
+                crossed = True
+        return crossed
+
+    def reset(self, username: str) -> None:
+        self.backend.reset(self._keys(username, "")["user"])
+
+
+def client_ip(request: Request, header: str = LOGIN_CLIENT_IP_HEADER) -> str:
+    """
+    returns the address failed logins are counted against. Behind a reverse
+    proxy the peer is the proxy, so with `header` set the last address in it
+    (the one the proxy saw) is used instead
+    """
+    if header:
+        forwarded = request.headers.get(header, "").split(",")[-1].strip()
+        if forwarded:
+            return forwarded
+    return request.client.host if request.client else ""
+
+
+THROTTLE_BACKENDS = {
+    "memory": MemoryThrottleBackend,
+    "sqlite": lambda: SQLiteThrottleBackend(LOGIN_THROTTLE_SQLITE_PATH),
+}
+
+login_throttle = LoginThrottle(THROTTLE_BACKENDS[LOGIN_THROTTLE_BACKEND]())
@@ -0,0 +1,96 @@
+import hashlib
+from datetime import date
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette import status
+from database import get_async_db, get_db
+from domain.user.user_crud import get_current_user, get_current_user_async
+from models import User
+
+
+def bump_data_version(db: Session, user_id: str | None) -> int | None:
+    """
+    Marks a user's accounts, transactions or budgets as changed and returns
+    the new version. Does not commit, so it shares the caller's database
+    transaction
+    """
+    if not user_id:
+        return None
+    return db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .returning(User.data_version)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+
+def get_data_version(db: Session, user_id: str) -> int:
+    """
+    returns a user's data version with a primary key lookup; the cached
+    principal's copy may be stale
+    """
+    return db.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+
+def data_version_etag(user_id: str, version: int) -> str:
+    """
+    returns the ETag of a user's data version. The date is part of it
+    because the "current month" endpoints change at midnight too
+    """
+    tag = f"{user_id}:{version}:{date.today().isoformat()}"
+    return f'W/"{hashlib.sha1(tag.encode()).hexdigest()[:20]}"'
+
+
+def check_data_version(request: Request, response: Response, etag: str) -> None:
+    """
+    sets the ETag header, or answers a matching If-None-Match with 304
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+        if "*" in candidates or etag in candidates:
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+    response.headers["ETag"] = etag
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """
+    Router dependency: sets the ETag of GET responses from the user's data
+    version and answers a matching If-None-Match with 304 before the route runs
+    """
+    if request.method != "GET":
+        return
+
+    etag = data_version_etag(current_user.id, get_data_version(db, current_user.id))
+    check_data_version(request, response, etag)
+
+
+async def conditional_get_async(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> None:
+    """
+    conditional_get for routers on the async session
+    """
+    if request.method != "GET":
+        return
+
+    version = await db.scalar(
+        select(User.data_version).where(User.id == current_user.id)
+    )
+    check_data_version(
+        request, response, data_version_etag(current_user.id, version or 0)
+    )
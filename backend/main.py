@@ -1,12 +1,56 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 
+from database import (
+    SQLITE_MAINTENANCE_INTERVAL,
+    THREADPOOL_SIZE,
+    run_sqlite_maintenance,
+    sqlite_tuning_enabled,
+)
+
 from domain.user import user_router
+from domain.user.user_password import shutdown_password_pool
 from domain.account import account_router
 from domain.transaction import transaction_router
 from domain.budget import budget_router
+from domain.dashboard import dashboard_router
+from domain.analytics import analytics_router
+
+
+logger = logging.getLogger(__name__)
+
+
+async def sqlite_maintenance_loop():
+    while True:
+        await asyncio.sleep(SQLITE_MAINTENANCE_INTERVAL)
+        try:
+            await run_in_threadpool(run_sqlite_maintenance)
+        except Exception:
+            logger.exception("SQLite maintenance failed")
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    maintenance = None
+    if sqlite_tuning_enabled():
+        maintenance = asyncio.create_task(sqlite_maintenance_loop())
+
+    yield
+
+    if maintenance:
+        maintenance.cancel()
+    shutdown_password_pool()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 origins = [
     "http://localhost:8000",
@@ -19,10 +63,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(user_router.router, tags=["User"])
+app.include_router(account_router.async_router, tags=["Account"])
 app.include_router(account_router.router, tags=["Account"])
 app.include_router(budget_router.router, tags=["Budget"])
+# before the transaction routes, whose /peppermint/{account_id}/{transaction_id}
+# would otherwise match /peppermint/analytics/...
+app.include_router(analytics_router.router, tags=["Analytics"])
 app.include_router(transaction_router.router, tags=["Transaction"])
-
+app.include_router(dashboard_router.router, tags=["Dashboard"])
@@ -0,0 +1,75 @@
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config
+from sqlalchemy import pool
+
+from alembic import context
+
+from database import SQLALCHEMY_DATABASE_URL
+from models import Base
+
+config = context.config
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL)
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# search objects created by raw SQL in 0009, unknown to the models
+SEARCH_TABLE_PREFIX = "transaction_search"
+SEARCH_INDEX = "ix_transaction_description_search"
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """
+    Leaves the full-text search objects out of autogenerate comparisons
+    """
+    if type_ == "table" and name.startswith(SEARCH_TABLE_PREFIX):
+        return False
+    return not (type_ == "index" and name == SEARCH_INDEX)
+
+
+def run_migrations_offline() -> None:
+    """
+    Run migrations in 'offline' mode (emit SQL without a database)
+    """
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Run migrations in 'online' mode
+    """
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=True,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
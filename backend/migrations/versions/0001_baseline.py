@@ -0,0 +1,76 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "site_user",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("modified", sa.DateTime(), nullable=False),
+        sa.Column("last_verified", sa.DateTime(), nullable=True),
+        sa.Column("last_login_attempt", sa.DateTime(), nullable=True),
+        sa.Column("login_attempts", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        sa.UniqueConstraint("username"),
+    )
+    op.create_table(
+        "account",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("account_type", sa.String(), nullable=False),
+        sa.Column("institution", sa.String(), nullable=False),
+        sa.Column("current_balance", sa.Float(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["site_user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "budget",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("budget_category", sa.String(), nullable=False),
+        sa.Column("budget_amount", sa.Float(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["site_user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "transaction",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("transaction_date", sa.DateTime(), nullable=False),
+        sa.Column("transaction_description", sa.String(), nullable=True),
+        sa.Column("transaction_category", sa.String(), nullable=True),
+        sa.Column("transaction_amount", sa.Float(), nullable=False),
+        sa.Column("account_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["account_id"], ["account.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transaction")
+    op.drop_table("budget")
+    op.drop_table("account")
+    op.drop_table("site_user")
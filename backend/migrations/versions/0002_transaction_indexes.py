@@ -0,0 +1,39 @@
+"""transaction date indexes
+
+Revision ID: 0002_transaction_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_transaction_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_transaction_account_id_transaction_date",
+        "transaction",
+        ["account_id", "transaction_date"],
+    )
+    op.create_index(
+        "ix_transaction_account_id_category_date",
+        "transaction",
+        ["account_id", "transaction_category", "transaction_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transaction_account_id_category_date", table_name="transaction")
+    op.drop_index(
+        "ix_transaction_account_id_transaction_date", table_name="transaction"
+    )
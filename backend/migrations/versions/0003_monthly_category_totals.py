@@ -0,0 +1,79 @@
+"""monthly category totals rollup
+
+Revision ID: 0003_monthly_category_totals
+Revises: 0002_transaction_indexes
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_monthly_category_totals"
+down_revision: Union[str, None] = "0002_transaction_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    rollup = op.create_table(
+        "monthly_category_totals",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("year_month", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["site_user.id"]),
+        sa.PrimaryKeyConstraint("user_id", "year_month", "category"),
+    )
+
+    # backfill from existing transactions
+    transaction = sa.table(
+        "transaction",
+        sa.column("transaction_date", sa.DateTime),
+        sa.column("transaction_category", sa.String),
+        sa.column("transaction_amount", sa.Float),
+        sa.column("account_id", sa.String),
+    )
+    account = sa.table(
+        "account", sa.column("id", sa.String), sa.column("user_id", sa.String)
+    )
+    year = sa.extract("year", transaction.c.transaction_date)
+    month = sa.extract("month", transaction.c.transaction_date)
+    category = sa.func.coalesce(transaction.c.transaction_category, "")
+
+    rows = op.get_bind().execute(
+        sa.select(
+            account.c.user_id,
+            year,
+            month,
+            category,
+            sa.func.sum(sa.func.abs(transaction.c.transaction_amount)),
+            sa.func.count(),
+        )
+        .select_from(
+            transaction.join(account, transaction.c.account_id == account.c.id)
+        )
+        .where(account.c.user_id.is_not(None))
+        .group_by(account.c.user_id, year, month, category)
+    )
+    values = [
+        {
+            "user_id": user_id,
+            "year_month": f"{int(row_year):04d}-{int(row_month):02d}",
+            "category": row_category,
+            "total": total,
+            "count": count,
+        }
+        for user_id, row_year, row_month, row_category, total, count in rows
+    ]
+    if values:
+        op.bulk_insert(rollup, values)
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_category_totals")
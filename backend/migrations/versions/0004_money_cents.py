@@ -0,0 +1,54 @@
+"""store money as integer cents
+
+Revision ID: 0004_money_cents
+Revises: 0003_monthly_category_totals
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_money_cents"
+down_revision: Union[str, None] = "0003_monthly_category_totals"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = [
+    ("account", "current_balance"),
+    ("transaction", "transaction_amount"),
+    ("budget", "budget_amount"),
+    ("monthly_category_totals", "total"),
+]
+
+
+def upgrade() -> None:
+    for table, column in MONEY_COLUMNS:
+        op.execute(
+            f'UPDATE "{table}" SET {column} = CAST(ROUND({column} * 100) AS BIGINT)'
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Float(),
+                type_=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::bigint",
+            )
+
+
+def downgrade() -> None:
+    for table, column in MONEY_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.BigInteger(),
+                type_=sa.Float(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::double precision",
+            )
+        op.execute(f'UPDATE "{table}" SET {column} = {column} / 100.0')
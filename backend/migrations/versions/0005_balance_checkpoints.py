@@ -0,0 +1,69 @@
+"""monthly balance checkpoints
+
+Revision ID: 0005_balance_checkpoints
+Revises: 0004_money_cents
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_balance_checkpoints"
+down_revision: Union[str, None] = "0004_money_cents"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    checkpoint = op.create_table(
+        "balance_checkpoint",
+        sa.Column("account_id", sa.String(), nullable=False),
+        sa.Column("period_start", sa.DateTime(), nullable=False),
+        sa.Column("net_amount", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["account_id"], ["account.id"]),
+        sa.PrimaryKeyConstraint("account_id", "period_start"),
+    )
+
+    # backfill from existing transactions, amounts are already in cents
+    transaction = sa.table(
+        "transaction",
+        sa.column("transaction_date", sa.DateTime),
+        sa.column("transaction_amount", sa.BigInteger),
+        sa.column("account_id", sa.String),
+    )
+    year = sa.extract("year", transaction.c.transaction_date)
+    month = sa.extract("month", transaction.c.transaction_date)
+
+    rows = op.get_bind().execute(
+        sa.select(
+            transaction.c.account_id,
+            year,
+            month,
+            sa.func.sum(transaction.c.transaction_amount),
+            sa.func.count(),
+        )
+        .where(transaction.c.account_id.is_not(None))
+        .group_by(transaction.c.account_id, year, month)
+    )
+    values = [
+        {
+            "account_id": account_id,
+            "period_start": datetime(int(row_year), int(row_month), 1),
+            "net_amount": net_amount,
+            "count": count,
+        }
+        for account_id, row_year, row_month, net_amount, count in rows
+    ]
+    if values:
+        op.bulk_insert(checkpoint, values)
+
+
+def downgrade() -> None:
+    op.drop_table("balance_checkpoint")
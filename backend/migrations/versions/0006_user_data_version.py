@@ -0,0 +1,31 @@
+"""per-user data version
+
+Revision ID: 0006_user_data_version
+Revises: 0005_balance_checkpoints
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_user_data_version"
+down_revision: Union[str, None] = "0005_balance_checkpoints"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("site_user") as batch_op:
+        batch_op.add_column(
+            sa.Column("data_version", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("site_user") as batch_op:
+        batch_op.drop_column("data_version")
@@ -0,0 +1,50 @@
+"""unique budget category per user
+
+Revision ID: 0007_budget_category_unique
+Revises: 0006_user_data_version
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_budget_category_unique"
+down_revision: Union[str, None] = "0006_user_data_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT user_id, budget_category, count(*) FROM budget "
+                "GROUP BY user_id, budget_category HAVING count(*) > 1"
+            )
+        )
+        .all()
+    )
+    if duplicates:
+        listed = ", ".join(
+            f"{user_id}/{category} ({count})" for user_id, category, count in duplicates
+        )
+        raise RuntimeError(
+            "Merge or delete the duplicate budgets before upgrading "
+            f"(user_id/budget_category): {listed}"
+        )
+
+    with op.batch_alter_table("budget") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_budget_user_id_budget_category", ["user_id", "budget_category"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("budget") as batch_op:
+        batch_op.drop_constraint("uq_budget_user_id_budget_category", type_="unique")
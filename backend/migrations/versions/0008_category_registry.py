@@ -0,0 +1,205 @@
+"""category registry
+
+Revision ID: 0008_category_registry
+Revises: 0007_budget_category_unique
+Create Date: 2026-10-18 19:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_category_registry"
+down_revision: Union[str, None] = "0007_budget_category_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, is_expense), ids 1.. in this order
+DEFAULT_CATEGORIES = [
+    ("auto-transport", True),
+    ("bills-utilities", True),
+    ("credit", False),
+    ("education", True),
+    ("fees-charges", True),
+    ("food-restaurants", True),
+    ("gas", True),
+    ("groceries", True),
+    ("health-fitness", True),
+    ("income", False),
+    ("misc", True),
+    ("mortgage-rent", True),
+    ("personal care", True),
+    ("pets", True),
+    ("refund", True),
+    ("shopping", True),
+    ("transfer", False),
+]
+
+CATEGORY_ID = "(SELECT id FROM category WHERE category.name = {column})"
+CATEGORY_NAME = "(SELECT name FROM category WHERE category.id = {column})"
+
+
+def rollup_table(category_column: sa.Column) -> list:
+    return [
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("year_month", sa.String(), nullable=False),
+        category_column,
+        sa.Column("total", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["site_user.id"]),
+        sa.PrimaryKeyConstraint("user_id", "year_month", category_column.name),
+    ]
+
+
+def upgrade() -> None:
+    category = op.create_table(
+        "category",
+        sa.Column(
+            "id",
+            sa.SmallInteger().with_variant(sa.Integer(), "sqlite"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("is_expense", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.bulk_insert(
+        category,
+        [
+            {"id": category_id, "name": name, "is_expense": is_expense}
+            for category_id, (name, is_expense) in enumerate(DEFAULT_CATEGORIES, 1)
+        ],
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('category', 'id'), "
+            "(SELECT max(id) FROM category))"
+        )
+
+    # any other category in use becomes an expense category
+    names = op.get_bind().execute(
+        sa.text(
+            'SELECT transaction_category FROM "transaction" '
+            "UNION SELECT budget_category FROM budget"
+        )
+    )
+    defaults = {name for name, _ in DEFAULT_CATEGORIES}
+    custom = sorted({name for (name,) in names if name and name not in defaults})
+    if custom:
+        op.bulk_insert(
+            category, [{"name": name, "is_expense": True} for name in custom]
+        )
+
+    # transactions
+    op.drop_index("ix_transaction_account_id_category_date", table_name="transaction")
+    op.add_column("transaction", sa.Column("category_id", sa.SmallInteger()))
+    op.execute(
+        'UPDATE "transaction" SET category_id = '
+        + CATEGORY_ID.format(column='"transaction".transaction_category')
+    )
+    with op.batch_alter_table("transaction") as batch_op:
+        batch_op.drop_column("transaction_category")
+        batch_op.create_foreign_key(
+            "fk_transaction_category_id_category", "category", ["category_id"], ["id"]
+        )
+    op.create_index(
+        "ix_transaction_account_id_category_id_date",
+        "transaction",
+        ["account_id", "category_id", "transaction_date"],
+    )
+
+    # budgets
+    op.add_column("budget", sa.Column("category_id", sa.SmallInteger()))
+    op.execute(
+        "UPDATE budget SET category_id = "
+        + CATEGORY_ID.format(column="budget.budget_category")
+    )
+    with op.batch_alter_table("budget") as batch_op:
+        batch_op.drop_constraint("uq_budget_user_id_budget_category", type_="unique")
+        batch_op.drop_column("budget_category")
+        batch_op.alter_column(
+            "category_id", existing_type=sa.SmallInteger(), nullable=False
+        )
+        batch_op.create_foreign_key(
+            "fk_budget_category_id_category", "category", ["category_id"], ["id"]
+        )
+        batch_op.create_unique_constraint(
+            "uq_budget_user_id_category_id", ["user_id", "category_id"]
+        )
+
+    # rollup, keyed by category id (0 for uncategorized)
+    op.rename_table("monthly_category_totals", "monthly_category_totals_old")
+    op.create_table(
+        "monthly_category_totals",
+        *rollup_table(
+            sa.Column(
+                "category_id", sa.SmallInteger(), nullable=False, autoincrement=False
+            )
+        ),
+    )
+    op.execute(
+        "INSERT INTO monthly_category_totals "
+        "(user_id, year_month, category_id, total, count) "
+        "SELECT user_id, year_month, COALESCE("
+        + CATEGORY_ID.format(column="monthly_category_totals_old.category")
+        + ", 0), total, count FROM monthly_category_totals_old"
+    )
+    op.drop_table("monthly_category_totals_old")
+
+
+def downgrade() -> None:
+    op.rename_table("monthly_category_totals", "monthly_category_totals_new")
+    op.create_table(
+        "monthly_category_totals",
+        *rollup_table(sa.Column("category", sa.String(), nullable=False)),
+    )
+    op.execute(
+        "INSERT INTO monthly_category_totals "
+        "(user_id, year_month, category, total, count) "
+        "SELECT user_id, year_month, COALESCE("
+        + CATEGORY_NAME.format(column="monthly_category_totals_new.category_id")
+        + ", ''), total, count FROM monthly_category_totals_new"
+    )
+    op.drop_table("monthly_category_totals_new")
+
+    op.add_column("budget", sa.Column("budget_category", sa.String()))
+    op.execute(
+        "UPDATE budget SET budget_category = "
+        + CATEGORY_NAME.format(column="budget.category_id")
+    )
+    with op.batch_alter_table("budget") as batch_op:
+        batch_op.drop_constraint("uq_budget_user_id_category_id", type_="unique")
+        batch_op.drop_constraint("fk_budget_category_id_category", type_="foreignkey")
+        batch_op.drop_column("category_id")
+        batch_op.alter_column(
+            "budget_category", existing_type=sa.String(), nullable=False
+        )
+        batch_op.create_unique_constraint(
+            "uq_budget_user_id_budget_category", ["user_id", "budget_category"]
+        )
+
+    op.drop_index(
+        "ix_transaction_account_id_category_id_date", table_name="transaction"
+    )
+    op.add_column("transaction", sa.Column("transaction_category", sa.String()))
+    op.execute(
+        'UPDATE "transaction" SET transaction_category = '
+        + CATEGORY_NAME.format(column='"transaction".category_id')
+    )
+    with op.batch_alter_table("transaction") as batch_op:
+        batch_op.drop_constraint(
+            "fk_transaction_category_id_category", type_="foreignkey"
+        )
+        batch_op.drop_column("category_id")
+    op.create_index(
+        "ix_transaction_account_id_category_date",
+        "transaction",
+        ["account_id", "transaction_category", "transaction_date"],
+    )
+
+    op.drop_table("category")
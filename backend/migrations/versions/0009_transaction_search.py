@@ -0,0 +1,109 @@
+"""transaction search
+
+Revision ID: 0009_transaction_search
+Revises: 0008_category_registry
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_transaction_search"
+down_revision: Union[str, None] = "0008_category_registry"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_INDEX = "ix_transaction_description_search"
+
+# same expression as transaction_search.search_transactions, which folds
+# accented letters because the 'simple' config keeps them
+ACCENTED = (
+    "àáâãäåçèéêëìíîïñòóôõöùúûüýÿāăąćĉċčďēĕėęěĝğġģĥĩīĭįĵķĺļľńņňōŏőŕŗřśŝşšţťũūŭůűųŵŷźżž"
+)
+UNACCENTED = (
+    "aaaaaaceeeeiiiinooooouuuuyyaaaccccdeeeeegggghiiiijklllnnnooorrrssssttuuuuuuwyzzz"
+)
+
+# external content table: it indexes "transaction" rows by rowid and stores
+# no copy of the descriptions
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE transaction_search USING fts5(
+        transaction_description,
+        content='transaction',
+        content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER transaction_search_insert AFTER INSERT ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(rowid, transaction_description)
+        VALUES (new.rowid, new.transaction_description);
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_delete AFTER DELETE ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(
+            transaction_search, rowid, transaction_description
+        )
+        VALUES ('delete', old.rowid, old.transaction_description);
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_update
+    AFTER UPDATE OF transaction_description ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(
+            transaction_search, rowid, transaction_description
+        )
+        VALUES ('delete', old.rowid, old.transaction_description);
+        INSERT INTO transaction_search(rowid, transaction_description)
+        VALUES (new.rowid, new.transaction_description);
+    END
+    """,
+    "INSERT INTO transaction_search(transaction_search) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER transaction_search_update",
+    "DROP TRIGGER transaction_search_delete",
+    "DROP TRIGGER transaction_search_insert",
+    "DROP TABLE transaction_search",
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            SEARCH_INDEX,
+            "transaction",
+            [
+                sa.text(
+                    "to_tsvector('simple'::regconfig, translate("
+                    "lower(coalesce(transaction_description, '')), "
+                    f"'{ACCENTED}', '{UNACCENTED}'))"
+                )
+            ],
+            postgresql_using="gin",
+        )
+        return
+
+    for statement in SQLITE_UPGRADE:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index(SEARCH_INDEX, table_name="transaction")
+        return
+
+    for statement in SQLITE_DOWNGRADE:
+        op.execute(statement)
@@ -0,0 +1,56 @@
+"""running totals on balance checkpoints
+
+Revision ID: 0010_checkpoint_cumulative
+Revises: 0009_transaction_search
+Create Date: 2026-10-18 23:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_checkpoint_cumulative"
+down_revision: Union[str, None] = "0009_transaction_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("balance_checkpoint") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "cumulative_amount",
+                sa.BigInteger(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+    # backfill: each month's running total of the account's monthly nets
+    checkpoint = sa.table(
+        "balance_checkpoint",
+        sa.column("account_id", sa.String),
+        sa.column("period_start", sa.DateTime),
+        sa.column("net_amount", sa.BigInteger),
+        sa.column("cumulative_amount", sa.BigInteger),
+    )
+    earlier = checkpoint.alias("earlier")
+    op.execute(
+        checkpoint.update().values(
+            cumulative_amount=sa.select(sa.func.sum(earlier.c.net_amount))
+            .where(
+                earlier.c.account_id == checkpoint.c.account_id,
+                earlier.c.period_start <= checkpoint.c.period_start,
+            )
+            .scalar_subquery()
+        )
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("balance_checkpoint") as batch_op:
+        batch_op.drop_column("cumulative_amount")
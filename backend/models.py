@@ -1,19 +1,53 @@
+from decimal import Decimal, ROUND_HALF_UP
 from sqlalchemy import (
     Column,
     ForeignKey,
     String,
     DateTime,
     Integer,
+    SmallInteger,
+    BigInteger,
     Text,
     Boolean,
-    Float,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import object_session, relationship
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
 
+def to_cents(amount: float | Decimal) -> int:
+    """
+    Converts an amount in currency units to integer cents
+    """
+    return int(
+        (Decimal(str(amount)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    )
+
+
+class Money(TypeDecorator):
+    """
+    Money stored as exact integer cents (BIGINT). Python values, and the
+    results of SUM() over Money columns, are floats in currency units
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return int(value) / 100
+
+
 class User(Base):
     """
     User table in DB
@@ -31,6 +65,8 @@ class User(Base):
     last_verified = Column(DateTime, nullable=True)
     last_login_attempt = Column(DateTime, nullable=True)
     login_attempts = Column(Integer, nullable=False)
+    # bumped by every account, transaction and budget change, drives ETags
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 class Account(Base):
@@ -42,11 +78,23 @@ class Account(Base):
     id = Column(String, primary_key=True)
     account_type = Column(String, unique=False, nullable=False)
     institution = Column(String, unique=False, nullable=False)
-    current_balance = Column(Float, unique=False, nullable=False)
+    current_balance = Column(Money, unique=False, nullable=False)
     user_id = Column(String, ForeignKey("site_user.id"))
     user = relationship("User", backref="account")
 
 
+class Category(Base):
+    """
+    Category table in DB. Transactions, budgets and the rollup reference it
+    by id; names are resolved through domain.category.category_crud
+    """
+
+    __tablename__ = "category"
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    is_expense = Column(Boolean, nullable=False)
+
+
 class Transaction(Base):
     """
     Transaction table in DB
@@ -56,11 +104,33 @@ class Transaction(Base):
     id = Column(String, primary_key=True)
     transaction_date = Column(DateTime, nullable=False)
     transaction_description = Column(String, unique=False, nullable=True)
-    transaction_category = Column(String, unique=False, nullable=True)
-    transaction_amount = Column(Float, unique=False, nullable=False)
+    category_id = Column(
+        SmallInteger,
+        ForeignKey("category.id", name="fk_transaction_category_id_category"),
+        nullable=True,
+    )
+    transaction_amount = Column(Money, unique=False, nullable=False)
     account_id = Column(String, ForeignKey("account.id"))
     account = relationship("Account", backref="transaction")
 
+    __table_args__ = (
+        Index(
+            "ix_transaction_account_id_transaction_date", account_id, transaction_date
+        ),
+        Index(
+            "ix_transaction_account_id_category_id_date",
+            account_id,
+            category_id,
+            transaction_date,
+        ),
+    )
+
+    @property
+    def transaction_category(self) -> str:
+        from domain.category.category_crud import get_category_name
+
+        return get_category_name(self.category_id, object_session(self))
+
 
 class Budget(Base):
     """
@@ -69,7 +139,52 @@ class Budget(Base):
 
     __tablename__ = "budget"
     id = Column(String, primary_key=True)
-    budget_category = Column(String, unique=False, nullable=False)
-    budget_amount = Column(Float, unique=False, nullable=False)
+    category_id = Column(
+        SmallInteger,
+        ForeignKey("category.id", name="fk_budget_category_id_category"),
+        nullable=False,
+    )
+    budget_amount = Column(Money, unique=False, nullable=False)
     user_id = Column(String, ForeignKey("site_user.id"))
     user = relationship("User", backref="budget")
+
+    __table_args__ = (
+        UniqueConstraint(user_id, category_id, name="uq_budget_user_id_category_id"),
+    )
+
+    @property
+    def budget_category(self) -> str:
+        from domain.category.category_crud import get_category_name
+
+        return get_category_name(self.category_id, object_session(self))
+
+
+class MonthlyCategoryTotal(Base):
+    """
+    Per user, month and category rollup of transactions in DB.
+    Kept up to date by the transaction CRUD functions
+    """
+
+    __tablename__ = "monthly_category_totals"
+    user_id = Column(String, ForeignKey("site_user.id"), primary_key=True)
+    year_month = Column(String, primary_key=True)
+    # 0 for transactions without a category
+    category_id = Column(SmallInteger, primary_key=True, autoincrement=False)
+    total = Column(Money, unique=False, nullable=False)
+    count = Column(Integer, unique=False, nullable=False)
+
+
+class BalanceCheckpoint(Base):
+    """
+    Per account and month net of transactions in DB, and the running total
+    of the account's transactions through that month, used to find the
+    balance at a date without scanning the whole history.
+    Kept up to date by the transaction CRUD functions
+    """
+
+    __tablename__ = "balance_checkpoint"
+    account_id = Column(String, ForeignKey("account.id"), primary_key=True)
+    period_start = Column(DateTime, primary_key=True)
+    net_amount = Column(Money, unique=False, nullable=False)
+    count = Column(Integer, unique=False, nullable=False)
+    cumulative_amount = Column(Money, nullable=False, default=0, server_default="0")
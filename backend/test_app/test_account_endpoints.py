@@ -2,14 +2,34 @@ import pytest
 from fastapi.testclient import TestClient
 from main import app
 import json
+import csv
+import io
 from domain.user.user_crud import get_user_by_username, get_user_by_id
 from domain.account.account_crud import get_account_by_id
-from database import SessionLocal
+from domain.transaction.transaction_crud import get_monthly_total_expenses
+from domain.transaction.transaction_checkpoint import rebuild_checkpoints
+from database import SessionLocal, get_db
+from datetime import datetime
+from models import BalanceCheckpoint
 
 
 client_401 = TestClient(app)
 
 
+def get_balance_checkpoints(db, account_id):
+    return (
+        db.query(
+            BalanceCheckpoint.period_start,
+            BalanceCheckpoint.net_amount,
+            BalanceCheckpoint.count,
+            BalanceCheckpoint.cumulative_amount,
+        )
+        .filter(BalanceCheckpoint.account_id == account_id)
+        .order_by(BalanceCheckpoint.period_start)
+        .all()
+    )
+
+
 @pytest.fixture
 def client():
     return TestClient(app)
@@ -376,6 +396,92 @@ def test_get_all_transactions(client, test_user):
     )
 
 
+def test_get_all_transactions_paginated(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "testbank_paged",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    for day in range(1, 6):
+        client.post(
+            f"/peppermint/{account_id}",
+            json={
+                "transaction_date": f"2024-10-0{day}T12:00:00",
+                "transaction_description": f"day {day}",
+                "transaction_category": "misc",
+                "transaction_amount": float(day),
+            },
+        )
+
+    first_page = client.get(
+        "/peppermint/account/all_transactions?limit=2",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert first_page.status_code == 200
+    assert [t["transaction_description"] for t in first_page.json()] == [
+        "day 5",
+        "day 4",
+    ]
+
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(
+        f"/peppermint/account/all_transactions?limit=2&after={cursor}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert [t["transaction_description"] for t in second_page.json()] == [
+        "day 3",
+        "day 2",
+    ]
+
+    last_page = client.get(
+        f"/peppermint/account/all_transactions?limit=2"
+        f"&after={second_page.headers['X-Next-Cursor']}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert [t["transaction_description"] for t in last_page.json()] == ["day 1"]
+    assert "X-Next-Cursor" not in last_page.headers
+
+    bad_cursor = client.get(
+        "/peppermint/account/all_transactions?limit=2&after=nope",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert bad_cursor.status_code == 400
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_read_paths_use_async_session_only(client, test_user):
+    """
+    The hot read routes, their auth and their ETag check run on the async
+    session alone, so they never open a sync session
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    def no_sync_session():
+        raise AssertionError("sync session requested")
+        yield
+
+    app.dependency_overrides[get_db] = no_sync_session
+    try:
+        for path in ["my_accounts", "all_transactions?limit=2", "total_balances"]:
+            response = client.get(f"/peppermint/account/{path}", headers=headers)
+            assert response.status_code == 200
+            assert response.headers["etag"]
+    finally:
+        del app.dependency_overrides[get_db]
+
+
 def test_get_all_expenses(client, test_user):
     access_token = test_setup_login_user(client, test_user)
     data_account_01 = {
@@ -626,6 +732,292 @@ def test_get_last_six_months_expense_totals(client, test_user):
     )
 
 
+def test_get_monthly_expense_totals(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    db = SessionLocal()
+    testuser = get_user_by_username(db, "testuser")
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "testbank_monthly",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    transactions = [
+        ("2024-01-31T23:59:59", "groceries", -20.0),
+        ("2024-02-01T00:00:00", "pets", 30.0),
+        ("2024-02-14T00:00:00", "income", 1000.0),
+        ("2024-02-15T00:00:00", "transfer", -50.0),
+        ("2023-12-31T23:59:59", "groceries", 99.0),
+    ]
+    for date, category, amount in transactions:
+        client.post(
+            f"/peppermint/{account_id}",
+            json={
+                "transaction_date": date,
+                "transaction_description": "",
+                "transaction_category": category,
+                "transaction_amount": amount,
+            },
+        )
+
+    totals = get_monthly_total_expenses(db, testuser.id, 2024, 2, 2)
+
+    assert list(totals.keys()) == ["Feb 2024", "Jan 2024"]
+    assert totals["Feb 2024"] == 30.0
+    assert totals["Jan 2024"] == 20.0
+
+    response = client.get(
+        "/peppermint/account/expenses/monthly?months=12",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == 12
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_export_transactions(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "testbank_export",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    for date, description in [
+        ("2024-06-01T08:00:00", "coffee, large"),
+        ("2024-07-01T08:00:00", "rent"),
+    ]:
+        client.post(
+            f"/peppermint/{account_id}",
+            json={
+                "transaction_date": date,
+                "transaction_description": description,
+                "transaction_category": "misc",
+                "transaction_amount": -3.5,
+            },
+        )
+
+    csv_response = client.get(
+        f"/peppermint/account/transactions/export?format=csv&account_id={account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert csv_response.status_code == 200
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(csv_response.text)))
+    assert [row["transaction_description"] for row in rows] == ["coffee, large", "rent"]
+    assert float(rows[0]["transaction_amount"]) == -3.5
+
+    ndjson_response = client.get(
+        "/peppermint/account/transactions/export?format=ndjson"
+        f"&account_id={account_id}&from=2024-07-01T00:00:00",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    lines = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["transaction_description"] == "rent"
+
+    # to is exclusive, but a date-only to includes that day
+    for to, descriptions in [
+        ("2024-07-01T08:00:00", ["coffee, large"]),
+        ("2024-07-01", ["coffee, large", "rent"]),
+    ]:
+        ndjson_response = client.get(
+            "/peppermint/account/transactions/export?format=ndjson"
+            f"&account_id={account_id}&to={to}",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        lines = [json.loads(line) for line in ndjson_response.text.splitlines()]
+        assert [line["transaction_description"] for line in lines] == descriptions
+
+    bad_format = client.get(
+        "/peppermint/account/transactions/export?format=xml",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert bad_format.status_code == 422
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_get_balance_history(client, test_user):
+    """
+    Balance history is rebuilt backwards from the current balance using the
+    monthly checkpoints
+    """
+    db = SessionLocal()
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "testbank_history",
+            "account_type": "checking",
+            "current_balance": 100.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    # out of order, so earlier months are inserted before later ones
+    for date, amount in [
+        ("2024-03-05T12:00:00", -10.0),
+        ("2024-01-10T12:00:00", -20.0),
+        ("2024-02-20T12:00:00", -0.1),
+        ("2024-02-15T12:00:00", 50.0),
+    ]:
+        client.post(
+            f"/peppermint/{account_id}",
+            json={
+                "transaction_date": date,
+                "transaction_description": "",
+                "transaction_category": "misc",
+                "transaction_amount": amount,
+            },
+        )
+
+    response = client.get(
+        f"/peppermint/account/{account_id}/balance_history"
+        "?from=2024-01-01T00:00:00&to=2024-04-01&step=month",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"date": "2024-01-01T00:00:00", "balance": 100.0},
+        {"date": "2024-02-01T00:00:00", "balance": 80.0},
+        {"date": "2024-03-01T00:00:00", "balance": 129.9},
+        {"date": "2024-04-01T00:00:00", "balance": 119.9},
+    ]
+    assert get_balance_checkpoints(db, account_id) == [
+        (datetime(2024, 1, 1), -20.0, 1, -20.0),
+        (datetime(2024, 2, 1), 49.9, 2, 29.9),
+        (datetime(2024, 3, 1), -10.0, 1, 19.9),
+    ]
+
+    # a datetime to is exclusive, and aware bounds are read as UTC
+    exclusive = client.get(
+        f"/peppermint/account/{account_id}/balance_history",
+        params={
+            "from": "2024-01-01T01:00:00+01:00",
+            "to": "2024-04-01T00:00:00",
+            "step": "month",
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert exclusive.status_code == 200
+    assert [point["balance"] for point in exclusive.json()] == [100.0, 80.0, 129.9]
+
+    # checkpoints follow updates to past transactions and match a rebuild
+    january = client.get(
+        f"/peppermint/account/{account_id}/transactions",
+        headers={"Authorization": f"Bearer {access_token}"},
+    ).json()[0]
+    client.put(
+        f"/peppermint/{account_id}/{january['id']}",
+        json={
+            "transaction_date": "2024-02-16T12:00:00",
+            "transaction_description": "",
+            "transaction_category": "misc",
+            "transaction_amount": -25.0,
+        },
+    )
+    expected = [
+        (datetime(2024, 2, 1), 24.9, 3, 24.9),
+        (datetime(2024, 3, 1), -10.0, 1, 14.9),
+    ]
+    assert get_balance_checkpoints(db, account_id) == expected
+    rebuild_checkpoints(db, account_id)
+    assert get_balance_checkpoints(db, account_id) == expected
+
+    daily = client.get(
+        f"/peppermint/account/{account_id}/balance_history"
+        "?from=2024-02-15T00:00:00&to=2024-02-17",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert [point["balance"] for point in daily.json()] == [100.0, 150.0, 125.0]
+
+    too_many = client.get(
+        f"/peppermint/account/{account_id}/balance_history"
+        "?from=1900-01-01T00:00:00&to=2024-01-01T00:00:00&step=day",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert too_many.status_code == 400
+
+    missing = client.get(
+        "/peppermint/account/not-an-account/balance_history",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert missing.status_code == 404
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert get_balance_checkpoints(db, account_id) == []
+    db.close()
+
+
+def test_conditional_get(client, test_user):
+    """
+    Reads carry an ETag from the user's data version; a matching
+    If-None-Match gets 304 until an account, transaction or budget changes
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.get("/peppermint/account/total_balances", headers=headers)
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    cached = client.get(
+        "/peppermint/account/total_balances",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    budgets = client.get(
+        "/peppermint/budget/my_budgets", headers={**headers, "If-None-Match": etag}
+    )
+    assert budgets.status_code == 304
+
+    accounts = client.get("/peppermint/account/my_accounts", headers=headers)
+    account_id = accounts.json()[0]["id"]
+    transaction = client.post(
+        f"/peppermint/{account_id}",
+        json={
+            "transaction_date": "2024-10-05T10:00:00",
+            "transaction_description": "",
+            "transaction_category": "misc",
+            "transaction_amount": 1.0,
+        },
+    ).json()
+
+    changed = client.get(
+        "/peppermint/account/total_balances",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    client.delete(f"/peppermint/{account_id}/{transaction['id']}")
+
 
 #  -------------------------------------------------------------------
 #  DELETE
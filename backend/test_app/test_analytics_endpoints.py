@@ -0,0 +1,378 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date
+from main import app
+from domain.analytics.analytics_cache import (
+    TransactionColumnCache,
+    TransactionColumns,
+    transaction_columns,
+)
+from domain.user.user_crud import get_user_by_username
+from database import SessionLocal
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def test_user():
+    return {"username": "analyticsuser", "password": "testpassword"}
+
+
+def test_setup_user(client):
+    """
+    Register user
+    """
+    data = {
+        "username": "analyticsuser",
+        "password1": "testpassword",
+        "password2": "testpassword",
+        "first_name": "ANALYTICS",
+        "last_name": "USER",
+        "email": "analyticsuser@testuser.com",
+    }
+    response = client.post("/peppermint/user/register", json=data)
+    assert response.status_code == 200
+
+
+def test_setup_login_user(client, test_user):
+    """
+    Login user
+    """
+    response = client.post("/peppermint/user/login", data=test_user)
+    assert response.status_code == 200
+
+    return response.json()["access_token"]
+
+
+def get_accounts(client, headers):
+    accounts = client.get("/peppermint/account/my_accounts", headers=headers).json()
+    return {account["institution"]: account["id"] for account in accounts}
+
+
+def test_setup_analytics_data(client, test_user):
+    """
+    Two accounts with spending across weeks and months, plus income
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    transactions = {
+        "analyticsbank": [
+            ("2024-12-30T09:00:00", "groceries", -10.0),
+            ("2025-01-02T09:00:00", "groceries", -5.0),
+            ("2025-01-02T10:00:00", "income", 100.0),
+            ("2025-01-06T09:00:00", "pets", -7.5),
+        ],
+        "analyticscredit": [
+            ("2025-01-03T18:00:00", "groceries", -2.25),
+            ("2025-02-14T12:00:00", "", -4.0),
+        ],
+    }
+    for institution, rows in transactions.items():
+        account = client.post(
+            "/peppermint/account/",
+            json={
+                "institution": institution,
+                "account_type": "checking",
+                "current_balance": 0.0,
+            },
+            headers=headers,
+        ).json()
+        for date, category, amount in rows:
+            response = client.post(
+                f"/peppermint/{account['id']}",
+                json={
+                    "transaction_date": date,
+                    "transaction_description": "",
+                    "transaction_category": category,
+                    "transaction_amount": amount,
+                },
+            )
+            assert response.status_code == 200
+
+
+def test_spending_by_month_and_category(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    response = client.get(
+        "/peppermint/analytics/spending?from=2024-12-01T00:00:00"
+        "&to=2025-02-28T23:59:59&granularity=month&group_by=category",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"period": "2024-12-01", "group": "groceries", "total": 10.0, "count": 1},
+        {"period": "2025-01-01", "group": "groceries", "total": 7.25, "count": 2},
+        {"period": "2025-01-01", "group": "pets", "total": 7.5, "count": 1},
+        {"period": "2025-02-01", "group": "", "total": 4.0, "count": 1},
+    ]
+
+
+def test_spending_by_week(client, test_user):
+    """
+    Weeks start on Monday, across a year boundary
+    """
+    access_token = test_setup_login_user(client, test_user)
+    response = client.get(
+        "/peppermint/analytics/spending?from=2024-12-30T00:00:00"
+        "&to=2025-01-12T23:59:59&granularity=week",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"period": "2024-12-30", "group": "groceries", "total": 17.25, "count": 3},
+        {"period": "2025-01-06", "group": "pets", "total": 7.5, "count": 1},
+    ]
+
+
+def test_spending_by_day_and_account(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    accounts = get_accounts(client, headers)
+
+    response = client.get(
+        "/peppermint/analytics/spending?from=2025-01-02T00:00:00"
+        "&to=2025-01-03T23:59:59&granularity=day&group_by=account",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "period": "2025-01-02",
+            "group": accounts["analyticsbank"],
+            "total": 5.0,
+            "count": 1,
+        },
+        {
+            "period": "2025-01-03",
+            "group": accounts["analyticscredit"],
+            "total": 2.25,
+            "count": 1,
+        },
+    ]
+
+
+def test_spending_range_end(client, test_user):
+    """
+    to is exclusive; a date-only to includes that day
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.get(
+        "/peppermint/analytics/spending?from=2025-01-02&to=2025-01-03T00:00:00"
+        "&granularity=day",
+        headers=headers,
+    )
+    assert [bucket["period"] for bucket in response.json()] == ["2025-01-02"]
+
+    response = client.get(
+        "/peppermint/analytics/spending?from=2025-01-02&to=2025-01-03"
+        "&granularity=day",
+        headers=headers,
+    )
+    assert [bucket["period"] for bucket in response.json()] == [
+        "2025-01-02",
+        "2025-01-03",
+    ]
+
+
+def test_range_timezones(client, test_user):
+    """
+    Timezone-aware from / to are compared as UTC; a default or date-only
+    bound mixes with them
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    def spending(params):
+        response = client.get(
+            "/peppermint/analytics/spending",
+            params={"granularity": "day", **params},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    assert spending(
+        {"from": "2025-01-02T02:00:00+02:00", "to": "2025-01-03T00:00:00Z"}
+    ) == spending({"from": "2025-01-02T00:00:00", "to": "2025-01-03T00:00:00"})
+    spending({"from": "2025-01-01T00:00:00Z"})
+    spending({"from": "2025-01-01T00:00:00Z", "to": "2025-01-03"})
+
+    for params in [
+        {"from": "2024-12-30T00:00:00Z"},
+        {"from": "2024-12-30T00:00:00+00:00", "to": "2025-01-05"},
+    ]:
+        response = client.get(
+            "/peppermint/analytics/stats", params=params, headers=headers
+        )
+        assert response.status_code == 200
+
+
+def test_spending_invalid_range(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.get(
+        "/peppermint/analytics/spending?from=2025-02-01T00:00:00"
+        "&to=2025-01-01T00:00:00",
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    response = client.get(
+        "/peppermint/analytics/spending?from=2025-01-01T00:00:00"
+        "&to=2025-01-01T00:00:00",
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    response = client.get(
+        "/peppermint/analytics/spending?from=2020-01-01T00:00:00"
+        "&to=2025-01-01T00:00:00&granularity=day",
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    response = client.get(
+        "/peppermint/analytics/spending?granularity=year", headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_spending_stats(client, test_user):
+    """
+    Income is left out; the rolling average also counts the day before from
+    """
+    access_token = test_setup_login_user(client, test_user)
+    response = client.get(
+        "/peppermint/analytics/stats?from=2024-12-30T00:00:00"
+        "&to=2025-01-05T23:59:59&window=2",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total"] == 17.25
+    assert stats["count"] == 3
+    assert stats["daily_average"] == 2.46
+    assert stats["by_category"] == {"groceries": 17.25}
+    assert stats["percentiles"] == {"p50": 5.0, "p90": 9.0, "p99": 9.9}
+    assert stats["rolling_average"] == [
+        {"date": "2024-12-30", "average": 5.0},
+        {"date": "2024-12-31", "average": 5.0},
+        {"date": "2025-01-01", "average": 0.0},
+        {"date": "2025-01-02", "average": 2.5},
+        {"date": "2025-01-03", "average": 3.62},
+        {"date": "2025-01-04", "average": 1.12},
+        {"date": "2025-01-05", "average": 0.0},
+    ]
+
+    # a date-only to includes that day, a midnight to excludes it
+    response = client.get(
+        "/peppermint/analytics/stats?from=2024-12-30&to=2025-01-05&window=2",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.json() == stats
+    response = client.get(
+        "/peppermint/analytics/stats?from=2024-12-30&to=2025-01-05T00:00:00"
+        "&window=2",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.json()["rolling_average"][-1]["date"] == "2025-01-04"
+
+
+def test_spending_stats_cache(client, test_user):
+    """
+    A new transaction is appended to the cached columns; other writes
+    rebuild them
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    url = (
+        "/peppermint/analytics/stats?from=2025-02-01T00:00:00" "&to=2025-02-28T23:59:59"
+    )
+    assert client.get(url, headers=headers).json()["total"] == 4.0
+    before = transaction_columns.stats()
+
+    account_id = get_accounts(client, headers)["analyticscredit"]
+    transaction = client.post(
+        f"/peppermint/{account_id}",
+        json={
+            "transaction_date": "2025-02-15T12:00:00",
+            "transaction_description": "",
+            "transaction_category": "pets",
+            "transaction_amount": -6.0,
+        },
+    ).json()
+    stats = client.get(url, headers=headers).json()
+    assert stats["total"] == 10.0
+    assert stats["by_category"] == {"": 4.0, "pets": 6.0}
+    after = transaction_columns.stats()
+    assert after["appends"] == before["appends"] + 1
+    assert after["builds"] == before["builds"]
+
+    response = client.delete(f"/peppermint/{account_id}/{transaction['id']}")
+    assert response.status_code == 204
+    assert client.get(url, headers=headers).json()["total"] == 4.0
+    assert transaction_columns.stats()["builds"] == after["builds"] + 1
+
+
+def test_transaction_column_cache_eviction():
+    """
+    The least recently used user is evicted past the byte budget
+    """
+    rows = [(date(2025, 1, 1), -100, None, "account")]
+    columns = TransactionColumns(1, rows)
+    cache = TransactionColumnCache(max_bytes=2 * columns.nbytes)
+
+    cache.put("a", columns)
+    cache.put("b", TransactionColumns(1, rows))
+    cache.append("a", 2, rows)
+    cache.put("c", TransactionColumns(1, rows))
+
+    assert cache.stats()["users"] == 2
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert "b" not in cache._entries
+    assert cache._entries["a"].version == 2
+    assert cache._entries["a"].size == 2
+    assert columns.size == 1
+
+    cache.append("a", 4, rows)
+    assert "a" not in cache._entries
+
+
+def test_spending_unauthorized(client):
+    response = client.get("/peppermint/analytics/spending")
+    assert response.status_code == 401
+
+    response = client.get("/peppermint/analytics/stats")
+    assert response.status_code == 401
+
+
+#  -------------------------------------------------------------------
+#  DELETE
+#  -------------------------------------------------------------------
+
+
+def test_delete_setup_user(client, test_user):
+    """
+    Deletes the accounts and user created during testing
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for account_id in get_accounts(client, headers).values():
+        client.delete(f"/peppermint/account/{account_id}", headers=headers)
+
+    db = SessionLocal()
+    analyticsuser = get_user_by_username(db, "analyticsuser")
+    response = client.delete(f"/peppermint/user/{analyticsuser.id}", headers=headers)
+    assert response.status_code == 204
+    db.close()
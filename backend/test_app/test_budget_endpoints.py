@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from main import app
 import json
+from datetime import datetime
 from domain.user.user_crud import get_user_by_username, get_user_by_id
 from domain.budget.budget_crud import get_budget_by_id
 from database import SessionLocal
@@ -57,7 +58,7 @@ def test_setup_login_user(client, test_user):
 def test_create_budget(client, test_user):
     access_token = test_setup_login_user(client, test_user)
     data = {
-        "budget_category": "Groceries",
+        "budget_category": "groceries",
         "budget_amount": 100.00,
     }
 
@@ -68,7 +69,7 @@ def test_create_budget(client, test_user):
     )
 
     assert response.status_code == 200
-    assert response.json()["budget_category"] == "Groceries"
+    assert response.json()["budget_category"] == "groceries"
     assert response.json()["budget_amount"] == 100.00
 
 
@@ -97,7 +98,7 @@ def test_budget_get_one(client, test_user):
     )
 
     assert response.status_code == 200
-    assert response.json()["budget_category"] == "Groceries"
+    assert response.json()["budget_category"] == "groceries"
     assert response.json()["budget_amount"] == 100.00
 
 
@@ -111,7 +112,7 @@ def test_budget_update(client, test_user):
     budget = budget_response.json()[0]
     budget_id = budget["id"]
     budget_update = {
-        "budget_category": "Shopping",
+        "budget_category": "shopping",
         "budget_amount": 133.78,
     }
 
@@ -122,12 +123,95 @@ def test_budget_update(client, test_user):
     )
 
     assert response.status_code == 200
-    assert response.json()["budget_category"] != "Groceries"
-    assert response.json()["budget_category"] == "Shopping"
+    assert response.json()["budget_category"] != "groceries"
+    assert response.json()["budget_category"] == "shopping"
     assert response.json()["budget_amount"] != 100.00
     assert response.json()["budget_amount"] == 133.78
 
 
+def test_budget_duplicate_category(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post(
+        "/peppermint/budget/",
+        json={"budget_category": "shopping", "budget_amount": 50.00},
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    education = client.post(
+        "/peppermint/budget/",
+        json={"budget_category": "education", "budget_amount": 50.00},
+        headers=headers,
+    )
+    assert education.status_code == 200
+
+    response = client.put(
+        f"/peppermint/budget/{education.json()['id']}",
+        json={"budget_category": "shopping", "budget_amount": 50.00},
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    response = client.delete(
+        f"/peppermint/budget/{education.json()['id']}", headers=headers
+    )
+    assert response.status_code == 204
+
+    budget_response = client.get("/peppermint/budget/my_budgets", headers=headers)
+    assert len(budget_response.json()) == 1
+
+
+def test_budget_unknown_category(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post(
+        "/peppermint/budget/",
+        json={"budget_category": "Travel", "budget_amount": 50.00},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+    budget_response = client.get("/peppermint/budget/my_budgets", headers=headers)
+    assert len(budget_response.json()) == 1
+
+
+def test_budget_same_category_other_user(client):
+    other_user = {"username": "budgetuser", "password": "budgetpassword"}
+    response = client.post(
+        "/peppermint/user/register",
+        json={
+            "username": "budgetuser",
+            "password1": "budgetpassword",
+            "password2": "budgetpassword",
+            "first_name": "BUDGET",
+            "last_name": "USER",
+            "email": "budgetuser@budgetuser.com",
+        },
+    )
+    assert response.status_code == 200
+    user_id = response.json()["id"]
+
+    access_token = test_setup_login_user(client, other_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = client.post(
+        "/peppermint/budget/",
+        json={"budget_category": "shopping", "budget_amount": 75.00},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["budget_category"] == "shopping"
+
+    response = client.delete(
+        f"/peppermint/budget/{response.json()['id']}", headers=headers
+    )
+    assert response.status_code == 204
+    response = client.delete(f"/peppermint/user/{user_id}", headers=headers)
+    assert response.status_code == 204
+
+
 def test_get_current_balances(client, test_user):
     access_token = test_setup_login_user(client, test_user)
 
@@ -167,6 +251,66 @@ def test_get_current_balances(client, test_user):
     )
 
 
+def test_budget_progress(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "progress_testbank",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers=headers,
+    )
+    account = account_response.json()
+    client.post(
+        f"/peppermint/{account['id']}",
+        json={
+            "transaction_date": "2025-01-08T10:00:00",
+            "transaction_description": "Shoe store",
+            "transaction_category": "shopping",
+            "transaction_amount": -33.78,
+        },
+    )
+
+    response = client.get("/peppermint/budget/progress?month=2025-01", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": response.json()[0]["id"],
+            "budget_category": "shopping",
+            "budget_amount": 133.78,
+            "spent": 33.78,
+            "remaining": 100.0,
+            "percent_used": 25.3,
+        }
+    ]
+
+    # without a month it reports the current one
+    response = client.get("/peppermint/budget/progress", headers=headers)
+    assert response.status_code == 200
+    current_month = datetime.today().strftime("%Y-%m")
+    assert (
+        response.json()
+        == client.get(
+            f"/peppermint/budget/progress?month={current_month}", headers=headers
+        ).json()
+    )
+
+    response = client.get("/peppermint/budget/progress?month=2024-12", headers=headers)
+    assert response.status_code == 200
+    assert response.json()[0]["spent"] == 0.0
+    assert response.json()[0]["remaining"] == 133.78
+    assert response.json()[0]["percent_used"] == 0.0
+
+    response = client.get("/peppermint/budget/progress?month=2025-13", headers=headers)
+    assert response.status_code == 422
+
+    client.delete(f"/peppermint/account/{account['id']}", headers=headers)
+
+
 #  -------------------------------------------------------------------
 #  DELETE
 #  -------------------------------------------------------------------
@@ -178,7 +322,7 @@ def test_budget_remove(client, test_user):
     """
     access_token = test_setup_login_user(client, test_user)
     new_data = {
-        "budget_category": "Gas",
+        "budget_category": "gas",
         "budget_amount": 200.00,
     }
 
@@ -0,0 +1,163 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from domain.user.user_crud import get_user_by_username
+from database import SessionLocal
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def test_user():
+    return {"username": "dashboarduser", "password": "testpassword"}
+
+
+def test_setup_user(client):
+    """
+    Register user
+    """
+    data = {
+        "username": "dashboarduser",
+        "password1": "testpassword",
+        "password2": "testpassword",
+        "first_name": "DASHBOARD",
+        "last_name": "USER",
+        "email": "dashboarduser@testuser.com",
+    }
+    response = client.post("/peppermint/user/register", json=data)
+    assert response.status_code == 200
+
+
+def test_setup_login_user(client, test_user):
+    """
+    Login user
+    """
+    response = client.post("/peppermint/user/login", data=test_user)
+    assert response.status_code == 200
+
+    return response.json()["access_token"]
+
+
+def test_setup_dashboard_data(client, test_user):
+    """
+    Accounts, transactions in this and last month, and a budget
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    this_month = datetime.today().replace(day=1, hour=12)
+    last_month = this_month - relativedelta(months=1)
+
+    for institution, balance in [("dashbank", 10.1), ("dashcredit", 0.2)]:
+        account = client.post(
+            "/peppermint/account/",
+            json={
+                "institution": institution,
+                "account_type": "checking",
+                "current_balance": balance,
+            },
+            headers=headers,
+        ).json()
+
+        for date, category, amount in [
+            (this_month, "groceries", -25.5),
+            (this_month, "income", 100.0),
+            (this_month, "pets", -4.5),
+            (last_month, "gas", -30.0),
+        ]:
+            client.post(
+                f"/peppermint/{account['id']}",
+                json={
+                    "transaction_date": date.isoformat(),
+                    "transaction_description": "",
+                    "transaction_category": category,
+                    "transaction_amount": amount,
+                },
+            )
+
+    response = client.post(
+        "/peppermint/budget/",
+        json={"budget_category": "education", "budget_amount": 50.0},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+
+def test_dashboard_matches_endpoints(client, test_user):
+    """
+    Every dashboard section equals the response of its own endpoint
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.get("/peppermint/dashboard", headers=headers)
+    assert response.status_code == 200
+    dashboard = response.json()
+
+    endpoints = {
+        "accounts": "/peppermint/account/my_accounts",
+        "total_balances": "/peppermint/account/total_balances",
+        "expenses": "/peppermint/account/expenses",
+        "six_months": "/peppermint/account/expenses/six_months",
+        "by_category": "/peppermint/account/expenses/by_category",
+        "budgets": "/peppermint/budget/my_budgets",
+        "current_balances": "/peppermint/budget/current_balances",
+    }
+    for section, endpoint in endpoints.items():
+        assert dashboard[section] == client.get(endpoint, headers=headers).json()
+
+    assert dashboard["expenses"] == 60.0
+    assert dashboard["by_category"] == {"groceries": 51.0, "pets": 9.0}
+    assert list(dashboard["six_months"].values())[1] == 60.0
+
+
+def test_dashboard_include(client, test_user):
+    """
+    include= limits the payload to the requested sections
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.get(
+        "/peppermint/dashboard?include=expenses,budgets", headers=headers
+    )
+    assert response.status_code == 200
+    assert set(response.json()) == {"expenses", "budgets"}
+
+    response = client.get("/peppermint/dashboard?include=weather", headers=headers)
+    assert response.status_code == 400
+
+
+def test_dashboard_unauthorized(client):
+    response = client.get("/peppermint/dashboard")
+    assert response.status_code == 401
+
+
+#  -------------------------------------------------------------------
+#  DELETE
+#  -------------------------------------------------------------------
+
+
+def test_delete_setup_user(client, test_user):
+    """
+    Deletes the budget, accounts and user created during testing
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for budget in client.get("/peppermint/budget/my_budgets", headers=headers).json():
+        client.delete(f"/peppermint/budget/{budget['id']}", headers=headers)
+    for account in client.get(
+        "/peppermint/account/my_accounts", headers=headers
+    ).json():
+        client.delete(f"/peppermint/account/{account['id']}", headers=headers)
+
+    db = SessionLocal()
+    dashboarduser = get_user_by_username(db, "dashboarduser")
+    response = client.delete(f"/peppermint/user/{dashboarduser.id}", headers=headers)
+    assert response.status_code == 204
+    db.close()
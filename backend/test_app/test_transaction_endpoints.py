@@ -1,12 +1,28 @@
+import re
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.testclient import TestClient
 from main import app
 from domain.transaction.transaction_crud import (
     get_account_transactions_all,
+    account_transactions_by_month_query,
+    valid_transaction,
 )
+from domain.transaction.transaction_rollup import (
+    get_monthly_category_totals,
+    rebuild_rollup,
+)
+from sqlalchemy import text
+from domain.category.category_crud import (
+    category_is_expense,
+    get_category_id,
+    get_category_name,
+)
+from fastapi import HTTPException
 from domain.user.user_crud import get_user_by_username
 
 from database import SessionLocal
+from models import BalanceCheckpoint, Category
 
 
 client_401 = TestClient(app)
@@ -102,7 +118,7 @@ def test_transaction_create(client, test_user):
     transaction_data = {
         "transaction_date": "2024-09-29T19:51:34.898000",
         "transaction_description": "Trader Jo",
-        "transaction_category": "Groceries",
+        "transaction_category": "groceries",
         "transaction_amount": 100.0,
     }
 
@@ -118,7 +134,7 @@ def test_transaction_create(client, test_user):
     assert response.status_code == 200
     assert response.json()["transaction_date"] == "2024-09-29T19:51:34.898000"
     assert response.json()["transaction_description"] == "Trader Jo"
-    assert response.json()["transaction_category"] == "Groceries"
+    assert response.json()["transaction_category"] == "groceries"
     assert "transaction_amount" in response.json()
     assert account_check["current_balance"] == 100.0
 
@@ -141,7 +157,7 @@ def test_one_transaction_get(client, test_user):
     new_transaction_data = {
         "transaction_date": "2024-10-01T19:51:34.898000",
         "transaction_description": "Whole Fud",
-        "transaction_category": "Groceries",
+        "transaction_category": "groceries",
         "transaction_amount": 25.0,
     }
 
@@ -192,7 +208,7 @@ def test_update_transaction(client, test_user):
     update_transaction_data = {
         "transaction_date": "2024-10-03T12:51:34.898000",
         "transaction_description": "Trader Yes",
-        "transaction_category": "Gas",
+        "transaction_category": "gas",
         "transaction_amount": 50.0,
     }
     # update transaction[0]
@@ -205,14 +221,376 @@ def test_update_transaction(client, test_user):
     )
 
     updated_account = account_response02.json()[0]
+    updated_transaction = next(
+        item for item in update_response.json() if item["id"] == transaction_id
+    )
     assert update_response.status_code == 200
     assert len(transactions) == 2
     assert updated_account["current_balance"] != 125.0
     assert updated_account["current_balance"] == 75.0
-    assert update_response.json()[0]["transaction_date"] != "2024-10-01T19:51:34.898000"
-    assert update_response.json()[0]["transaction_description"] == "Trader Yes"
-    assert update_response.json()[0]["transaction_category"] == "Gas"
-    assert update_response.json()[0]["transaction_amount"] == 50.0
+    assert updated_transaction["transaction_date"] != "2024-10-01T19:51:34.898000"
+    assert updated_transaction["transaction_description"] == "Trader Yes"
+    assert updated_transaction["transaction_category"] == "gas"
+    assert updated_transaction["transaction_amount"] == 50.0
+
+
+def test_transaction_account_mismatch(client, test_user):
+    """
+    Transactions are only reachable through their own account
+    """
+    db = SessionLocal()
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.get(
+        "/peppermint/account/my_accounts",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account = account_response.json()[0]
+    transaction = get_account_transactions_all(db, account["id"])[0]
+    testuser = get_user_by_username(db, "testuser")
+
+    assert valid_transaction(db, account["id"], transaction.id)
+    assert valid_transaction(db, account["id"], transaction.id, testuser.id)
+    assert not valid_transaction(db, account["id"], transaction.id, "someone-else")
+    assert not valid_transaction(db, "other-account", transaction.id)
+
+    response = client.get(f"/peppermint/other-account/{transaction.id}")
+    assert response.status_code == 404
+
+    response = client.delete(f"/peppermint/{account['id']}/not-a-transaction")
+    assert response.status_code == 404
+
+
+def test_transaction_amounts_are_exact(client, test_user):
+    """
+    Balances are kept in integer cents, so repeated edits do not drift
+    """
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "centbank",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    for _ in range(3):
+        client.post(
+            f"/peppermint/{account_id}",
+            json={
+                "transaction_date": "2024-10-05T10:00:00",
+                "transaction_description": "",
+                "transaction_category": "misc",
+                "transaction_amount": 0.1,
+            },
+        )
+
+    account_check = client.get(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert account_check.json()["current_balance"] == 0.3
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_concurrent_transaction_creates(client, test_user):
+    """
+    100 writers posting to one account at once lose no balance updates
+    """
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "busybank",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    def post_transaction(i):
+        return client.post(
+            f"/peppermint/{account_id}",
+            json={
+                "transaction_date": "2024-10-05T10:00:00",
+                "transaction_description": f"writer {i}",
+                "transaction_category": "misc",
+                "transaction_amount": 1.25,
+            },
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=100) as executor:
+        statuses = list(executor.map(post_transaction, range(100)))
+
+    account_check = client.get(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert statuses == [200] * 100
+    assert account_check.json()["current_balance"] == 125.0
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_transaction_bulk_create(client, test_user):
+    """
+    Bulk CSV / NDJSON import test
+    """
+    db = SessionLocal()
+    access_token = test_setup_login_user(client, test_user)
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "bulkbank",
+            "account_type": "checking",
+            "current_balance": 10.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    csv_body = (
+        "transaction_date,transaction_description,transaction_category,transaction_amount\n"
+        "2024-10-01T10:00:00,Trader Jo,groceries,20.5\n"
+        "not-a-date,Broken,groceries,5\n"
+        '2024-10-02T10:00:00,"Gas, station",gas,-4.5\n'
+        "2024-10-02T11:00:00,Casino,gambling,-1\n"
+    )
+    csv_response = client.post(
+        f"/peppermint/{account_id}/bulk",
+        content=csv_body,
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert csv_response.status_code == 200
+    assert csv_response.json()["inserted"] == 2
+    assert [error["line"] for error in csv_response.json()["errors"]] == [3, 5]
+    assert "Unknown category" in csv_response.json()["errors"][1]["detail"]
+
+    ndjson_body = (
+        '{"transaction_date": "2024-10-03T10:00:00", "transaction_description": "Pets", '
+        '"transaction_category": "pets", "transaction_amount": 4}\n'
+        "{not json}\n"
+    )
+    ndjson_response = client.post(
+        f"/peppermint/{account_id}/bulk",
+        content=ndjson_body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert ndjson_response.status_code == 200
+    assert ndjson_response.json()["inserted"] == 1
+    assert ndjson_response.json()["errors"][0]["line"] == 2
+
+    transactions = get_account_transactions_all(db, account_id)
+    account_check = client.get(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert len(transactions) == 3
+    assert account_check.json()["current_balance"] == 30.0
+
+    unsupported = client.post(
+        f"/peppermint/{account_id}/bulk",
+        content="[]",
+        headers={"Content-Type": "application/json"},
+    )
+    assert unsupported.status_code == 415
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+def test_transaction_bulk_create_sub_cent(client, test_user):
+    """
+    Sub-cent amounts are rounded per row before they move the balance and
+    checkpoints, as in single creates
+    """
+    db = SessionLocal()
+    access_token = test_setup_login_user(client, test_user)
+    account_id = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "subcentbank",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    ).json()["id"]
+
+    row = (
+        '{"transaction_date": "2024-10-03T10:00:00", "transaction_description": "", '
+        '"transaction_category": "misc", "transaction_amount": 0.005}\n'
+    )
+    response = client.post(
+        f"/peppermint/{account_id}/bulk",
+        content=row * 2,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["inserted"] == 2
+
+    transactions = get_account_transactions_all(db, account_id)
+    account_check = client.get(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    checkpoint = (
+        db.query(BalanceCheckpoint.net_amount)
+        .filter(BalanceCheckpoint.account_id == account_id)
+        .scalar()
+    )
+
+    assert [t.transaction_amount for t in transactions] == [0.01, 0.01]
+    assert account_check.json()["current_balance"] == 0.02
+    assert checkpoint == 0.02
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    db.close()
+
+
+def test_monthly_category_rollup(client, test_user):
+    """
+    Rollup follows creates, date/category moves and deletes, and matches a rebuild
+    """
+    db = SessionLocal()
+    access_token = test_setup_login_user(client, test_user)
+    testuser = get_user_by_username(db, "testuser")
+    gas, pets = get_category_id(db, "gas"), get_category_id(db, "pets")
+    account_response = client.post(
+        "/peppermint/account/",
+        json={
+            "institution": "rollupbank",
+            "account_type": "checking",
+            "current_balance": 0.0,
+        },
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    account_id = account_response.json()["id"]
+
+    first = client.post(
+        f"/peppermint/{account_id}",
+        json={
+            "transaction_date": "2023-03-05T10:00:00",
+            "transaction_description": "",
+            "transaction_category": "gas",
+            "transaction_amount": -40.0,
+        },
+    ).json()
+    client.post(
+        f"/peppermint/{account_id}",
+        json={
+            "transaction_date": "2023-03-06T10:00:00",
+            "transaction_description": "",
+            "transaction_category": "gas",
+            "transaction_amount": -10.0,
+        },
+    )
+
+    assert get_monthly_category_totals(db, testuser.id, 2023, 3) == {gas: 50.0}
+
+    client.put(
+        f"/peppermint/{account_id}/{first['id']}",
+        json={
+            "transaction_date": "2023-04-01T10:00:00",
+            "transaction_description": "",
+            "transaction_category": "pets",
+            "transaction_amount": -15.0,
+        },
+    )
+
+    assert get_monthly_category_totals(db, testuser.id, 2023, 3) == {gas: 10.0}
+    assert get_monthly_category_totals(db, testuser.id, 2023, 4) == {pets: 15.0}
+
+    client.delete(f"/peppermint/{account_id}/{first['id']}")
+    assert get_monthly_category_totals(db, testuser.id, 2023, 4) == {}
+
+    rebuild_rollup(db, testuser.id)
+    assert get_monthly_category_totals(db, testuser.id, 2023, 3) == {gas: 10.0}
+
+    client.delete(
+        f"/peppermint/account/{account_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert get_monthly_category_totals(db, testuser.id, 2023, 3) == {}
+
+
+def test_category_registry(client):
+    """
+    Category names resolve through the registry; unknown names are
+    rejected instead of growing the category table
+    """
+    db = SessionLocal()
+    categories = db.query(Category).count()
+    misc_id = get_category_id(db, "misc")
+    assert get_category_name(misc_id) == "misc"
+    assert category_is_expense(misc_id)
+    assert not category_is_expense(get_category_id(db, "income"))
+    assert get_category_id(db, "") is None
+    assert get_category_name(None) == ""
+
+    with pytest.raises(HTTPException) as error:
+        get_category_id(db, "new-category")
+    assert error.value.status_code == 422
+
+    response = client.post(
+        "/peppermint/not-an-account",
+        json={
+            "transaction_date": "2024-10-01T10:00:00",
+            "transaction_description": "",
+            "transaction_category": "new-category",
+            "transaction_amount": 1.0,
+        },
+    )
+    assert response.status_code == 422
+    assert db.query(Category).count() == categories
+    db.close()
+
+
+def test_month_query_uses_date_index():
+    """
+    Monthly transaction query is served by the (account_id, transaction_date) index
+    """
+    db = SessionLocal()
+    query = account_transactions_by_month_query(db, "account-id", 2024, 10)
+    sql = str(query.statement.compile(db.bind, compile_kwargs={"literal_binds": True}))
+
+    if db.get_bind().dialect.name == "postgresql":
+        # the test table is tiny, make sure the planner does not prefer a seq scan
+        db.execute(text("SET enable_seqscan = off"))
+        plan = db.execute(text(f"EXPLAIN {sql}")).scalars().all()
+    else:
+        plan = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    details = " ".join(plan)
+    dialect = db.get_bind().dialect.name
+    db.close()
+
+    if dialect == "postgresql":
+        # on the tiny test table the (account_id, category_id, transaction_date)
+        # index costs the same and may win the tie; either way the month
+        # range must be an index condition, not a filter
+        assert re.search(
+            r"Index Cond: .*transaction_date >= .*transaction_date <", details
+        )
+    else:
+        assert "ix_transaction_account_id_transaction_date" in details
+    assert re.search(r"transaction_date\s*>", details)
 
 
 # ---------------------------------------------------------
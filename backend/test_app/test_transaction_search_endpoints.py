@@ -0,0 +1,226 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from domain.user.user_crud import get_user_by_username
+from database import SessionLocal
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def test_user():
+    return {"username": "searchuser", "password": "testpassword"}
+
+
+def test_setup_user(client):
+    """
+    Register user
+    """
+    data = {
+        "username": "searchuser",
+        "password1": "testpassword",
+        "password2": "testpassword",
+        "first_name": "SEARCH",
+        "last_name": "USER",
+        "email": "searchuser@testuser.com",
+    }
+    response = client.post("/peppermint/user/register", json=data)
+    assert response.status_code == 200
+
+
+def test_setup_login_user(client, test_user):
+    """
+    Login user
+    """
+    response = client.post("/peppermint/user/login", data=test_user)
+    assert response.status_code == 200
+
+    return response.json()["access_token"]
+
+
+def get_accounts(client, headers):
+    accounts = client.get("/peppermint/account/my_accounts", headers=headers).json()
+    return {account["institution"]: account["id"] for account in accounts}
+
+
+def search(client, test_user, params):
+    access_token = test_setup_login_user(client, test_user)
+    response = client.get(
+        "/peppermint/transactions/search",
+        params=params,
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def descriptions(results):
+    return sorted(result["transaction_description"] for result in results)
+
+
+def test_setup_search_data(client, test_user):
+    """
+    Two accounts with a few descriptions to search
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    transactions = {
+        "searchbank": [
+            ("2025-01-02T09:00:00", "AMAZON MKTPLACE PMTS", -25.0),
+            ("2025-01-05T09:00:00", "Amazon Prime Video", -8.99),
+            ("2025-01-07T09:00:00", "Café Luna", -4.5),
+            ("2025-01-09T09:00:00", "Shell gas station", -40.0),
+        ],
+        "searchcredit": [
+            ("2025-01-12T18:00:00", "amazon.com refund", 25.0),
+        ],
+    }
+    for institution, rows in transactions.items():
+        account = client.post(
+            "/peppermint/account/",
+            json={
+                "institution": institution,
+                "account_type": "checking",
+                "current_balance": 0.0,
+            },
+            headers=headers,
+        ).json()
+        for date, description, amount in rows:
+            response = client.post(
+                f"/peppermint/{account['id']}",
+                json={
+                    "transaction_date": date,
+                    "transaction_description": description,
+                    "transaction_category": "shopping",
+                    "transaction_amount": amount,
+                },
+            )
+            assert response.status_code == 200
+
+
+def test_search_words_and_prefixes(client, test_user):
+    amazon = [
+        "AMAZON MKTPLACE PMTS",
+        "Amazon Prime Video",
+        "amazon.com refund",
+    ]
+    assert descriptions(search(client, test_user, {"q": "amazon"})) == amazon
+    assert descriptions(search(client, test_user, {"q": "AMAZ"})) == amazon
+    assert descriptions(search(client, test_user, {"q": "amazon prime"})) == [
+        "Amazon Prime Video"
+    ]
+    assert descriptions(search(client, test_user, {"q": "cafe"})) == ["Café Luna"]
+    assert search(client, test_user, {"q": "netflix"}) == []
+
+
+def test_search_ignores_query_syntax(client, test_user):
+    """
+    Operators and quotes in q are searched as plain words
+    """
+    results = search(client, test_user, {"q": 'amazon" OR NEAR(gas'})
+    assert results == []
+
+    results = search(client, test_user, {"q": "-prime*"})
+    assert descriptions(results) == ["Amazon Prime Video"]
+
+
+def test_search_filters(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    accounts = get_accounts(client, {"Authorization": f"Bearer {access_token}"})
+
+    results = search(
+        client, test_user, {"q": "amazon", "account_id": accounts["searchcredit"]}
+    )
+    assert descriptions(results) == ["amazon.com refund"]
+
+    results = search(
+        client,
+        test_user,
+        {"q": "amazon", "from": "2025-01-03T00:00:00", "to": "2025-01-10T00:00:00"},
+    )
+    assert descriptions(results) == ["Amazon Prime Video"]
+
+    # to is exclusive, but a date-only to includes that day
+    results = search(client, test_user, {"q": "amazon", "to": "2025-01-05T09:00:00"})
+    assert descriptions(results) == ["AMAZON MKTPLACE PMTS"]
+    results = search(client, test_user, {"q": "amazon", "to": "2025-01-05"})
+    assert descriptions(results) == ["AMAZON MKTPLACE PMTS", "Amazon Prime Video"]
+
+
+def test_search_pagination(client, test_user):
+    everything = search(client, test_user, {"q": "amazon"})
+    first = search(client, test_user, {"q": "amazon", "limit": 2})
+    second = search(client, test_user, {"q": "amazon", "limit": 2, "offset": 2})
+
+    assert len(first) == 2
+    assert len(second) == 1
+    assert first + second == everything
+
+
+def test_search_follows_updates_and_deletes(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    account_id = get_accounts(client, {"Authorization": f"Bearer {access_token}"})[
+        "searchbank"
+    ]
+    transaction = search(client, test_user, {"q": "shell"})[0]
+
+    response = client.put(
+        f"/peppermint/{account_id}/{transaction['id']}",
+        json={
+            "transaction_date": transaction["transaction_date"],
+            "transaction_description": "Chevron fuel",
+            "transaction_category": "gas",
+            "transaction_amount": transaction["transaction_amount"],
+        },
+    )
+    assert response.status_code == 200
+    assert search(client, test_user, {"q": "shell"}) == []
+    assert descriptions(search(client, test_user, {"q": "chevron"})) == ["Chevron fuel"]
+
+    response = client.delete(f"/peppermint/{account_id}/{transaction['id']}")
+    assert response.status_code == 204
+    assert search(client, test_user, {"q": "chevron"}) == []
+
+
+def test_search_invalid(client, test_user):
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.get("/peppermint/transactions/search", headers=headers)
+    assert response.status_code == 422
+
+    response = client.get(
+        "/peppermint/transactions/search?q=amazon&limit=0", headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_search_unauthorized(client):
+    response = client.get("/peppermint/transactions/search?q=amazon")
+    assert response.status_code == 401
+
+
+#  -------------------------------------------------------------------
+#  DELETE
+#  -------------------------------------------------------------------
+
+
+def test_delete_setup_user(client, test_user):
+    """
+    Deletes the accounts and user created during testing
+    """
+    access_token = test_setup_login_user(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for account_id in get_accounts(client, headers).values():
+        client.delete(f"/peppermint/account/{account_id}", headers=headers)
+
+    db = SessionLocal()
+    searchuser = get_user_by_username(db, "searchuser")
+    response = client.delete(f"/peppermint/user/{searchuser.id}", headers=headers)
+    assert response.status_code == 204
+    db.close()
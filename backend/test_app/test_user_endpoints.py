@@ -3,6 +3,18 @@ from fastapi.testclient import TestClient
 from main import app
 import json
 from domain.user.user_crud import get_user_by_username, get_user_by_id
+from domain.user.user_cache import get_principal_cache_stats
+from domain.user.user_password import PASSWORD_HASH_ROUNDS
+from domain.user.user_throttle import (
+    LOGIN_MAX_ATTEMPTS,
+    LoginThrottle,
+    SQLiteThrottleBackend,
+    ThrottleBackend,
+    client_ip,
+    login_throttle,
+)
+from starlette.requests import Request
+from passlib.context import CryptContext
 from database import SessionLocal
 
 client_401 = TestClient(app)
@@ -113,6 +125,120 @@ def test_testuser_login(client, test_user):
     return response.json()["access_token"]
 
 
+def test_testuser_login_rehashes_password(client, test_user):
+    """
+    A password hashed with another bcrypt cost is rehashed on login
+    """
+    db = SessionLocal()
+    testuser = get_user_by_username(db, "testuser")
+    testuser.password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(
+        test_user["password"]
+    )
+    db.commit()
+
+    response = client.post("/peppermint/user/login", data=test_user)
+    assert response.status_code == 200
+
+    db.expire_all()
+    testuser = get_user_by_username(db, "testuser")
+    assert testuser.password.startswith(f"$2b${PASSWORD_HASH_ROUNDS:02d}$")
+    db.close()
+
+
+def test_login_lockout(client, test_user):
+    """
+    Failed logins are counted in memory, the lockout is only persisted once
+    the threshold is crossed
+    """
+    data = {
+        "username": "lockeduser",
+        "password1": "testpassword",
+        "password2": "testpassword",
+        "first_name": "LOCKED",
+        "last_name": "USER",
+        "email": "lockeduser@testuser.com",
+    }
+    client.post("/peppermint/user/register", json=data)
+    db = SessionLocal()
+    wrong_password = {"username": "lockeduser", "password": "wrongpassword"}
+
+    for _ in range(LOGIN_MAX_ATTEMPTS - 1):
+        response = client.post("/peppermint/user/login", data=wrong_password)
+        assert response.status_code == 401
+    assert get_user_by_username(db, "lockeduser").login_attempts == 0
+
+    client.post("/peppermint/user/login", data=wrong_password)
+    db.expire_all()
+    assert get_user_by_username(db, "lockeduser").login_attempts == LOGIN_MAX_ATTEMPTS
+
+    response = client.post(
+        "/peppermint/user/login",
+        data={"username": "lockeduser", "password": "testpassword"},
+    )
+    assert response.status_code == 401
+    assert "Too many failed login attempts" in response.json()["detail"]
+
+    # the persisted lockout still applies without the in-memory counters
+    login_throttle.reset("lockeduser")
+    response = client.post(
+        "/peppermint/user/login",
+        data={"username": "lockeduser", "password": "testpassword"},
+    )
+    assert response.status_code == 401
+
+    access_token = test_testuser_login(client, test_user)
+    client.delete(
+        f"/peppermint/user/{get_user_by_username(db, 'lockeduser').id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    db.close()
+
+
+def test_sqlite_throttle_backend(tmp_path):
+    """
+    The shared SQLite backend counts failures like the in-memory one
+    """
+    throttle = LoginThrottle(
+        SQLiteThrottleBackend(str(tmp_path / "throttle.db")),
+        max_attempts=2,
+        max_attempts_per_ip=5,
+        window=60,
+    )
+
+    assert throttle.record_failure("someone", "10.0.0.1") is False
+    assert throttle.blocked_for("someone", "10.0.0.1") == 0
+    assert throttle.record_failure("someone", "10.0.0.1") is True
+    assert 0 < throttle.blocked_for("someone", "10.0.0.1") <= 60
+    # the IP is not blocked for other usernames yet
+    assert throttle.blocked_for("someone-else", "10.0.0.1") == 0
+
+    throttle.reset("someone")
+    assert throttle.blocked_for("someone", "10.0.0.1") == 0
+
+
+def test_throttle_backend_is_abstract():
+    with pytest.raises(TypeError):
+        ThrottleBackend()
+
+
+def test_client_ip():
+    """
+    The forwarded header is only used when configured, and then its last
+    address, which the proxy appended
+    """
+    request = Request(
+        {
+            "type": "http",
+            "client": ("10.0.0.2", 1234),
+            "headers": [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.7")],
+        }
+    )
+
+    assert client_ip(request, header="") == "10.0.0.2"
+    assert client_ip(request, header="X-Forwarded-For") == "203.0.113.7"
+    assert client_ip(request, header="X-Real-IP") == "10.0.0.2"
+
+
 def test_testuser_get(client, test_user):
     """
     GET /user/ test
@@ -237,6 +363,46 @@ def test_user_update_by_user_id(client, test_user):
     assert response.json()["email"] != "testuser@testuser.com"
 
 
+def test_principal_cache(client, test_user):
+    """
+    Repeated authenticated reads are served from the principal cache, and a
+    username change invalidates the cached principal
+    """
+    access_token = test_testuser_login(client, test_user)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    client.get("/peppermint/user/", headers=headers)
+
+    before = get_principal_cache_stats()
+    response = client.get("/peppermint/user/", headers=headers)
+    after = get_principal_cache_stats()
+
+    assert response.status_code == 200
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+    update_data = {
+        "username": "renameduser",
+        "password1": "testpassword",
+        "password2": "testpassword",
+        "first_name": "TEST",
+        "last_name": "USER",
+        "email": "testuser@testuser.com",
+    }
+    client.put("/peppermint/user/", json=update_data, headers=headers)
+
+    # the old token's subject no longer exists
+    assert client.get("/peppermint/user/", headers=headers).status_code == 401
+
+    renamed_token = test_testuser_login(
+        client, {"username": "renameduser", "password": "testpassword"}
+    )
+    client.put(
+        "/peppermint/user/",
+        json={**update_data, "username": "testuser"},
+        headers={"Authorization": f"Bearer {renamed_token}"},
+    )
+
+
 #  -------------------------------------------------------------------
 #  DELETE
 #  -------------------------------------------------------------------